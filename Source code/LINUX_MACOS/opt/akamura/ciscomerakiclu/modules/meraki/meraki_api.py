@@ -37,6 +37,13 @@ import subprocess
 import sys
 import csv
 import os
+import json
+import codecs
+import time
+import random
+import threading
+import hashlib
+import logging
 try:
     from tabulate import tabulate
 except ImportError:
@@ -46,6 +53,643 @@ try:
     from termcolor import colored
 except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "termcolor"])
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import OrderedDict
+from modules.meraki.meraki_api_stats import api_stats
+from utilities import tracing
+
+
+# ==================================================
+# DEFINE the shared HTTP client for the Meraki API
+# ==================================================
+# MERAKI_BASE_URL points the CLU at another Dashboard, e.g. the local mock server
+BASE_URL = os.environ.get("MERAKI_BASE_URL", "https://api.meraki.com/api/v1").rstrip("/")
+
+# (connect, read) timeouts in seconds, slow org-wide endpoints get more room
+DEFAULT_TIMEOUT = (5, 30)
+ENDPOINT_TIMEOUTS = {
+    "/organizations/{organization_id}/networks": (5, 60),
+    "/organizations/{organization_id}/devices/statuses": (5, 90),
+    "/organizations/{organization_id}/uplinks/statuses": (5, 90),
+    "/devices/{serial}/switch/ports/statuses": (5, 60),
+}
+
+# ==================================================
+# THROTTLE requests per Organization (10 calls/s)
+# ==================================================
+RATE_LIMIT_PER_SECOND = 10
+# Tokens a prefetch leaves in the bucket so the user's own requests never wait on it
+RESERVED_FOR_INTERACTIVE = 3
+MAX_RETRIES = 5
+BACKOFF_BASE = 1
+BACKOFF_CAP = 30
+
+class RateLimiter:
+    """
+    Token bucket per Organization ID. Network and device endpoints are charged
+    to the Organization that owns them once it is known, unknown owners share
+    a single bucket.
+    """
+    def __init__(self, rate=RATE_LIMIT_PER_SECOND, burst=RATE_LIMIT_PER_SECOND, reserved=RESERVED_FOR_INTERACTIVE):
+        self.rate = rate
+        self.burst = burst
+        self.reserved = reserved
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key):
+        # Take a token now and return how long the caller has to wait before using it
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+            self._buckets[key] = (tokens, now)
+        return -tokens / self.rate if tokens < 0 else 0
+
+    def acquire(self, key):
+        wait = self.reserve(key)
+        if wait:
+            with tracing.span("rate limiter", "throttle", organization=key):
+                time.sleep(wait)
+        return wait
+
+    def acquire_background(self, key, job):
+        # Low priority: a token is taken only while 'reserved' others stay free,
+        # and the wait ends early when the prefetch is cancelled or promoted
+        waited = 0.0
+        with tracing.span("rate limiter", "throttle", organization=key, priority="background"):
+            while not job.promoted:
+                with self._lock:
+                    now = time.monotonic()
+                    tokens, last = self._buckets.get(key, (self.burst, now))
+                    tokens = min(self.burst, tokens + (now - last) * self.rate)
+                    if tokens - 1 >= self.reserved:
+                        self._buckets[key] = (tokens - 1, now)
+                        return waited
+                    self._buckets[key] = (tokens, now)
+                    wait = min(PREFETCH_POLL_INTERVAL, (self.reserved + 1 - tokens) / self.rate)
+                if job.cancelled.wait(wait):
+                    raise PrefetchCancelled()
+                waited += wait
+        return waited + self.acquire(key)
+
+    def penalize(self, key, seconds):
+        # Empty the bucket so that every caller of this Organization waits 'seconds'
+        with self._lock:
+            self._buckets[key] = (1 - seconds * self.rate, time.monotonic())
+
+rate_limiter = RateLimiter()
+
+# Network IDs and device serials mapped to the Organization that owns them
+organization_of = {}
+
+def remember_organization(organization_id, network_ids=(), serials=()):
+    if organization_id is None:
+        return
+    for object_id in list(network_ids) + list(serials):
+        organization_of[object_id] = organization_id
+
+def rate_limit_key(path_params):
+    if "organization_id" in path_params:
+        return path_params["organization_id"]
+    for param in ("network_id", "serial"):
+        if param in path_params:
+            return organization_of.get(path_params[param])
+    return None
+
+def retry_after_seconds(response):
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", 1)))
+    except ValueError:
+        return 1.0
+
+
+# ==================================================
+# REVALIDATE reads with ETag / If-None-Match
+# ==================================================
+ETAG_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+class ETagStore:
+    """
+    Last response received for each URL that carried an ETag. On a 304 the
+    stored response is handed back, so unchanged payloads cost a header exchange.
+    """
+    def __init__(self, max_bytes=ETAG_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._responses = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+            return response
+
+    def put(self, key, response):
+        with self._lock:
+            previous = self._responses.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.content)
+            self._responses[key] = response
+            self._size += len(response.content)
+            while self._size > self.max_bytes and self._responses:
+                _, evicted = self._responses.popitem(last=False)
+                self._size -= len(evicted.content)
+
+etag_store = ETagStore()
+
+
+# ==================================================
+# COALESCE concurrent identical requests
+# ==================================================
+class SingleFlight:
+    """
+    Callers asking for a key that is already being fetched wait for that
+    request and share its result instead of sending their own.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fetch):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            tracing.instant("coalesced request", "http", url=key[1])
+            return call.result()
+
+        try:
+            result = fetch()
+            call.set_result(result)
+            return result
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+in_flight = SingleFlight()
+
+
+class MerakiClient:
+    """
+    Keep-alive connection pool shared by every call to the Dashboard API,
+    so menu navigation reuses warm TLS connections instead of handshaking again.
+    """
+    def __init__(self, base_url=BASE_URL, pool_size=10):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate"
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, api_key, endpoint, params=None, url=None, stream=False, **path_params):
+        # 'url' is used as-is when following Link headers, 'endpoint' stays the template
+        if url is None:
+            url = self.base_url + endpoint.format(**path_params)
+        request_key = (account_of(api_key), requests.Request("GET", url, params=params).prepare().url)
+        if stream:
+            # A streamed body can be read only once, so it is neither shared nor kept
+            return self._get(api_key, endpoint, url, params, request_key, path_params, stream=True)
+        try:
+            return in_flight.do(request_key, lambda: self._get(api_key, endpoint, url, params, request_key, path_params))
+        except PrefetchCancelled:
+            # The request joined was a prefetch cancelled meanwhile, send it again
+            if current_prefetch() is not None:
+                raise
+            return in_flight.do(request_key, lambda: self._get(api_key, endpoint, url, params, request_key, path_params))
+
+    def _get(self, api_key, endpoint, url, params, request_key, path_params, stream=False):
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        headers = {"X-Cisco-Meraki-API-Key": api_key}
+        key = rate_limit_key(path_params)
+
+        known = None if stream else etag_store.get(request_key)
+        if known is not None:
+            headers["If-None-Match"] = known.headers["ETag"]
+
+        started = time.monotonic()
+        throttle_wait = 0.0
+        job = current_prefetch()
+        for attempt in range(MAX_RETRIES + 1):
+            throttle_wait += rate_limiter.acquire_background(key, job) if job is not None else rate_limiter.acquire(key)
+            with tracing.span(f"GET {endpoint}", "http", url=url, attempt=attempt, stream=stream) as http_span:
+                response = self.session.get(url, headers=headers, params=params, timeout=timeout, stream=stream)
+                http_span.set(status=response.status_code)
+
+            if response.status_code == 304 and known is not None:
+                api_stats.record(endpoint, 304, time.monotonic() - started, 0, attempt, throttle_wait)
+                return known
+            if response.status_code == 200 and "ETag" in response.headers and not stream:
+                etag_store.put(request_key, response)
+
+            if attempt < MAX_RETRIES and response.status_code == 429:
+                # The next acquire() sleeps exactly as long as Retry-After asks
+                response.close()
+                api_stats.record_retry_status(endpoint, 429)
+                rate_limiter.penalize(key, retry_after_seconds(response))
+                continue
+            if attempt < MAX_RETRIES and response.status_code >= 500:
+                response.close()
+                api_stats.record_retry_status(endpoint, response.status_code)
+                time.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+                continue
+
+            # A streamed body is not read yet, its declared length is the best estimate
+            received = int(response.headers.get("Content-Length", 0)) if stream else len(response.content)
+            api_stats.record(endpoint, response.status_code, time.monotonic() - started, received, attempt, throttle_wait)
+            return response
+
+    def post(self, api_key, endpoint, body, **path_params):
+        # Writes are not coalesced, cached or retried on 5xx since they may have been applied
+        url = self.base_url + endpoint.format(**path_params)
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        headers = {"X-Cisco-Meraki-API-Key": api_key}
+        key = rate_limit_key(path_params)
+
+        started = time.monotonic()
+        throttle_wait = 0.0
+        for attempt in range(MAX_RETRIES + 1):
+            throttle_wait += rate_limiter.acquire(key)
+            with tracing.span(f"POST {endpoint}", "http", url=url, attempt=attempt) as http_span:
+                response = self.session.post(url, headers=headers, json=body, timeout=timeout)
+                http_span.set(status=response.status_code)
+            if attempt < MAX_RETRIES and response.status_code == 429:
+                api_stats.record_retry_status(endpoint, 429)
+                rate_limiter.penalize(key, retry_after_seconds(response))
+                continue
+            api_stats.record(endpoint, response.status_code, time.monotonic() - started, len(response.content), attempt, throttle_wait)
+            return response
+
+client = MerakiClient()
+
+
+# ==================================================
+# CACHE read-mostly resources for the session
+# ==================================================
+# Seconds before a cached resource is fetched again
+CACHE_TTLS = {
+    "organizations": 3600,
+    "networks": 900,
+    "statuses": 60,
+    "policy_objects": 900,
+    "policy_objects_groups": 900
+}
+CACHE_MAX_ENTRIES = 256
+MISSING = object()
+
+class TTLCache:
+    """
+    Session-scoped cache with a time-to-live per resource and least recently
+    used eviction once 'max_entries' is reached.
+    """
+    def __init__(self, ttls=CACHE_TTLS, max_entries=CACHE_MAX_ENTRIES):
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, resource, *key):
+        with self._lock:
+            entry = self._entries.get((resource,) + key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[(resource,) + key]
+                return MISSING
+            self._entries.move_to_end((resource,) + key)
+        tracing.instant("memory cache hit", resource=resource)
+        return value
+
+    def set(self, resource, *key_and_value):
+        *key, value = key_and_value
+        with self._lock:
+            self._entries[(resource, *key)] = (value, time.monotonic() + self.ttls.get(resource, 0))
+            self._entries.move_to_end((resource, *key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, resource=None, *key):
+        # No arguments clear everything, a resource alone clears all its entries
+        with self._lock:
+            for entry_key in list(self._entries):
+                if resource is None or entry_key[:len(key) + 1] == (resource,) + key:
+                    del self._entries[entry_key]
+
+cache = TTLCache()
+# Time of the last full clear, nothing persisted or mirrored before it is served again
+cleared_at = 0.0
+
+def invalidate_cache(resource=None, *key):
+    global cleared_at
+    cache.invalidate(resource, *key)
+    if resource is None:
+        cleared_at = time.time()
+        network_device_index.clear()
+
+
+# ==================================================
+# PERSIST responses in the encrypted response store
+# ==================================================
+# Older entries are not shown, the user waits for fresh data instead
+PERSISTED_MAX_AGE = 7 * 24 * 3600
+
+logger = logging.getLogger('ciscomerakiclu')
+response_store = None
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+def attach_response_store(store):
+    global response_store
+    response_store = store
+
+def account_of(api_key):
+    # The store never sees the API key itself
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+def load_persisted(api_key, endpoint, **params):
+    if response_store is None:
+        return MISSING
+    entry = response_store.get(account_of(api_key), endpoint, params)
+    if entry is None or time.time() - entry["fetched_at"] > PERSISTED_MAX_AGE or entry["fetched_at"] <= cleared_at:
+        return MISSING
+    tracing.instant("response store hit", endpoint=endpoint)
+    return entry["body"]
+
+def persist(api_key, endpoint, body, etag=None, **params):
+    if response_store is not None:
+        response_store.put(account_of(api_key), endpoint, params, body, etag)
+
+def revalidate_in_background(key, fetch):
+    """
+    Run 'fetch' in a daemon thread to replace data that was served from the
+    response store, at most once at a time for the same key.
+    """
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+
+    def worker():
+        try:
+            fetch()
+        except Exception:
+            logger.error("Background revalidation of %s failed", key, exc_info=True)
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+
+# ==================================================
+# READ from the Organization mirror when one is attached
+# ==================================================
+mirror = None
+
+def attach_mirror(organization_mirror):
+    global mirror
+    mirror = organization_mirror
+
+def from_mirror(api_key, resource, key):
+    if mirror is None:
+        return MISSING
+    value = mirror.lookup(api_key, resource, key)
+    if value is not MISSING:
+        tracing.instant("mirror hit", resource=resource)
+    return value
+
+def record_in_mirror(api_key, resource, key, value):
+    if mirror is not None and value is not None:
+        mirror.record(api_key, resource, key, value)
+
+
+# ==================================================
+# PREFETCH in the background while the user reads a menu
+# ==================================================
+PREFETCH_WORKERS = 4
+PREFETCH_POLL_INTERVAL = 0.05
+RECENT_ORGANIZATIONS = 3
+
+class PrefetchCancelled(Exception):
+    pass
+
+class PrefetchJob:
+    def __init__(self, key):
+        self.key = key
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.promoted = False
+
+class Prefetcher:
+    """
+    Run getters in daemon threads while a menu waits for input, so the next
+    screen finds their results in the caches. Prefetch requests use only the
+    spare rate limit tokens and stop at their next request once cancelled.
+    """
+    def __init__(self, workers=PREFETCH_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="meraki-prefetch")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def current(self):
+        return getattr(self._local, "job", None)
+
+    def submit(self, key, fetch):
+        with self._lock:
+            if key in self._jobs:
+                return
+            job = self._jobs[key] = PrefetchJob(key)
+        self._executor.submit(self._run, job, fetch)
+
+    def _run(self, job, fetch):
+        self._local.job = job
+        try:
+            if not job.cancelled.is_set():
+                with tracing.span("prefetch", "prefetch", key=str(job.key[:1] + job.key[2:])):
+                    fetch()
+        except PrefetchCancelled:
+            tracing.instant("prefetch cancelled", "prefetch", key=str(job.key[:1] + job.key[2:]))
+        except Exception:
+            logger.debug("Prefetch of %s failed", job.key[:1] + job.key[2:], exc_info=True)
+        finally:
+            self._local.job = None
+            job.done.set()
+            with self._lock:
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+
+    def bind(self, function):
+        # Requests sent from helper threads keep the priority of the prefetch that started them
+        job = self.current()
+        if job is None:
+            return function
+
+        def run(*args, **kwargs):
+            self._local.job = job
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._local.job = None
+        return run
+
+    def cancel(self, keep=()):
+        with self._lock:
+            for key, job in self._jobs.items():
+                if key not in keep:
+                    job.cancelled.set()
+
+    def wait(self, key):
+        # The user needs this result now, the job continues at full priority
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None or job is self.current() or job.cancelled.is_set():
+            return
+        job.promoted = True
+        with tracing.span("wait for prefetch", "prefetch"):
+            job.done.wait()
+
+prefetcher = Prefetcher()
+
+def current_prefetch():
+    return prefetcher.current()
+
+# Last Organizations picked in the menus, most recent first, kept in the response store
+recent_organizations_of = {}
+
+def recent_organizations(api_key):
+    if api_key not in recent_organizations_of:
+        recent = load_persisted(api_key, "recent_organizations")
+        recent_organizations_of[api_key] = recent if recent is not MISSING else []
+    return recent_organizations_of[api_key]
+
+def remember_recent_organization(api_key, organization_id):
+    recent = [organization_id] + [other for other in recent_organizations(api_key) if other != organization_id]
+    recent_organizations_of[api_key] = recent[:RECENT_ORGANIZATIONS]
+    persist(api_key, "recent_organizations", recent_organizations_of[api_key])
+
+def prefetch_networks(api_key, organization_ids):
+    for organization_id in organization_ids:
+        prefetcher.submit(("networks", api_key, organization_id), lambda organization_id=organization_id: list(iter_meraki_networks(api_key, organization_id)))
+
+def prefetch_network(api_key, organization_id, network_id):
+    # What the network menu shows first: its devices and their statuses
+    prefetcher.submit(("devices", api_key, network_id), lambda: get_network_device_index(api_key, network_id))
+    prefetcher.submit(
+        ("statuses", api_key, organization_id, (network_id,), NETWORK_STATUS_PRODUCT_TYPES),
+        lambda: fetch_organization_devices_statuses(api_key, organization_id, (network_id,), NETWORK_STATUS_PRODUCT_TYPES)
+    )
+
+
+# ==================================================
+# DECODE large JSON arrays incrementally
+# ==================================================
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def iter_json_array(chunks):
+    """
+    Yield the items of a top-level JSON array while its bytes are still
+    arriving, only the undecoded tail of the stream is kept in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    started = False
+
+    for chunk in chunks:
+        buffer += utf8.decode(chunk)
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("The response is not a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+            # A number is complete only once the delimiter after it has arrived
+            if end == len(buffer) or buffer[end] not in ",] \t\r\n":
+                break
+            yield item
+            pos = end
+        buffer = buffer[pos:]
+
+    if buffer.strip():
+        raise ValueError("The JSON array ended unexpectedly")
+
+
+# ==================================================
+# DECODE response bodies
+# ==================================================
+def decode_json(response):
+    with tracing.span("decode JSON", "decode", bytes=len(response.content)):
+        return response.json()
+
+
+# ==================================================
+# PAGINATE list endpoints following the Link header
+# ==================================================
+class MerakiAPIError(Exception):
+    def __init__(self, response):
+        self.status_code = response.status_code
+        super().__init__(f"status code: {response.status_code}, {response.text}")
+
+def iter_pages(api_key, endpoint, params=None, per_page=None, stream=False, **path_params):
+    """
+    Yield the items of a paginated list endpoint one by one, following the
+    RFC 5988 'Link: rel=next' header. The next page is already downloading
+    while the caller works on the current one, and at most two pages are
+    held in memory. With stream=True items are decoded as the bytes of each
+    page arrive instead of once the whole page has been received.
+    """
+    params = dict(params or {})
+    if per_page:
+        params["perPage"] = per_page
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    get = prefetcher.bind(client.get)
+    try:
+        pending = executor.submit(get, api_key, endpoint, params, stream=stream, **path_params)
+        while pending:
+            response = pending.result()
+            if response.status_code != 200:
+                raise MerakiAPIError(response)
+
+            next_url = response.links.get("next", {}).get("url")
+            pending = executor.submit(get, api_key, endpoint, url=next_url, stream=stream, **path_params) if next_url else None
+            if stream:
+                with response:
+                    yield from iter_json_array(response.iter_content(STREAM_CHUNK_SIZE))
+            else:
+                yield from decode_json(response)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def collect_pages(api_key, endpoint, params=None, per_page=None, **path_params):
+    return list(iter_pages(api_key, endpoint, params, per_page, **path_params))
 
 
 # ==================================================
@@ -114,25 +758,97 @@ def export_firewall_rules_to_csv(firewall_rules, network_name, base_folder_path)
         print("No data to export.")
 
 
+# ==================================================
+# EXPORT switch ports of a whole network to CSV
+# ==================================================
+def export_switch_ports_to_csv(port_rows, network_name, base_folder_path):
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    filename = f"{network_name}_{current_date}_switch_ports.csv"
+    file_path = os.path.join(base_folder_path, filename)
+
+    if port_rows:
+        with open(file_path, 'w', newline='', encoding='utf-8') as file:
+            fieldnames = [col.upper() for col in port_rows[0].keys()]
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            for port in port_rows:
+                writer.writerow({col.upper(): value for col, value in port.items()})
+
+        print(f"Data exported to {file_path}")
+    else:
+        print("No data to export.")
+
+
+# ==================================================
+# EXPORT devices statuses streamed from the API to CSV
+# ==================================================
+def export_devices_statuses_to_csv(api_key, organization_id, network_id, network_name, base_folder_path):
+    current_date = datetime.now().strftime("%Y-%m-%d")
+    filename = f"{network_name}_{current_date}_devices_statuses.csv"
+    file_path = os.path.join(base_folder_path, filename)
+
+    # Columns are fixed up front since rows are written while they are decoded
+    columns = ['name', 'serial', 'mac', 'model', 'productType', 'status', 'lanIp', 'publicIp', 'gateway', 'ipType', 'primaryDns', 'secondaryDns', 'lastReportedAt']
+    statuses = iter_organization_devices_statuses(api_key, organization_id, network_ids=[network_id], stream=True)
+
+    count = 0
+    try:
+        with open(file_path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=[col.upper() for col in columns])
+            writer.writeheader()
+            for device in statuses:
+                writer.writerow({col.upper(): device.get(col, '') for col in columns})
+                count += 1
+    except MerakiAPIError as e:
+        print(f"Failed to fetch organization devices statuses. Status code: {e.status_code}")
+        return
+
+    if count:
+        print(f"Data exported to {file_path}")
+    else:
+        os.remove(file_path)
+        print("No data to export.")
+
+
 # ==================================================
 # GET a list of Organizations
 # ==================================================
+def fetch_meraki_organizations(api_key):
+    response = client.get(api_key, "/organizations")
+    if response.status_code != 200:
+        return None
+    organizations = decode_json(response)
+    cache.set("organizations", api_key, organizations)
+    persist(api_key, "/organizations", organizations, response.headers.get("ETag"))
+    return organizations
+
 def get_meraki_organizations(api_key):
-    url = "https://api.meraki.com/api/v1/organizations"
-    headers = {
-        "X-Cisco-Meraki-API-Key": api_key,
-        "Content-Type": "application/json"
-    }
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
+    organizations = cache.get("organizations", api_key)
+    if organizations is not MISSING:
+        return organizations
+
+    # Last known list from a previous session, refreshed while the user reads it
+    organizations = load_persisted(api_key, "/organizations")
+    if organizations is not MISSING:
+        cache.set("organizations", api_key, organizations)
+        revalidate_in_background(("organizations", api_key), lambda: fetch_meraki_organizations(api_key))
+        return organizations
+
+    organizations = fetch_meraki_organizations(api_key)
+    if organizations is None:
         print("Failed to fetch organizations")
-        return None
+    return organizations
 
 def select_organization(api_key):
     organizations = get_meraki_organizations(api_key)
     if organizations:
+        # Networks of the likely choices download while the list is being read
+        known = {org['id'] for org in organizations}
+        likely = [org_id for org_id in recent_organizations(api_key) if org_id in known]
+        if not likely and len(organizations) <= RECENT_ORGANIZATIONS:
+            likely = [org['id'] for org in organizations]
+        prefetch_networks(api_key, likely)
+
         for idx, org in enumerate(organizations, 1):
             print(f"{idx}. {org['name']}")
 
@@ -140,48 +856,82 @@ def select_organization(api_key):
         try:
             selected_index = int(choice) - 1
             if 0 <= selected_index < len(organizations):
-                return organizations[selected_index]
+                selected = organizations[selected_index]
+                prefetcher.cancel(keep=[("networks", api_key, selected['id'])])
+                remember_recent_organization(api_key, selected['id'])
+                return selected
             else:
                 print("Invalid selection.")
         except ValueError:
             print("Please enter a number.")
 
+    prefetcher.cancel()
     return None
 
 
 # ==================================================
 # GET a list of Networks in an Organization
 # ==================================================
+def fetch_meraki_networks(api_key, organization_id, per_page=5000):
+    networks = []
+    for network in iter_pages(api_key, "/organizations/{organization_id}/networks", per_page=per_page, organization_id=organization_id):
+        remember_organization(organization_id, network_ids=[network['id']])
+        networks.append(network)
+        yield network
+
+    # The list is cached only once every page has been received
+    cache.set("networks", api_key, organization_id, networks)
+    persist(api_key, "/organizations/{organization_id}/networks", networks, organization_id=organization_id)
+
+def iter_meraki_networks(api_key, organization_id, per_page=5000):
+    prefetcher.wait(("networks", api_key, organization_id))
+    cached = cache.get("networks", api_key, organization_id)
+    if cached is not MISSING:
+        yield from cached
+        return
+
+    # Mirrored Organizations are kept current by their own sync, no revalidation needed
+    mirrored = from_mirror(api_key, "networks", organization_id)
+    if mirrored is not MISSING:
+        cache.set("networks", api_key, organization_id, mirrored)
+        yield from mirrored
+        return
+
+    cached = load_persisted(api_key, "/organizations/{organization_id}/networks", organization_id=organization_id)
+    if cached is not MISSING:
+        remember_organization(organization_id, network_ids=[network['id'] for network in cached])
+        cache.set("networks", api_key, organization_id, cached)
+        revalidate_in_background(("networks", api_key, organization_id), lambda: list(fetch_meraki_networks(api_key, organization_id, per_page)))
+        yield from cached
+        return
+
+    yield from fetch_meraki_networks(api_key, organization_id, per_page)
+
 def get_meraki_networks(api_key, organization_id, per_page=5000):
-    url = f"https://api.meraki.com/api/v1/organizations/{organization_id}/networks"
-    headers = {
-        "X-Cisco-Meraki-API-Key": api_key,
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
-    params = {
-        "perPage": per_page
-    }
-    response = requests.get(url, headers=headers, params=params)
-    if response.status_code == 200:
-        networks = response.json()
-        # Sort the networks by name
-        networks.sort(key=lambda x: x['name'])
-        return networks
-    else:
+    try:
+        networks = list(iter_meraki_networks(api_key, organization_id, per_page))
+    except MerakiAPIError:
         print("Failed to fetch networks")
         return None, None
+    # Sort the networks by name
+    networks.sort(key=lambda x: x['name'])
+    return networks
 
 
 # ==================================================
 # SELECT a Network in an Organization
 # ==================================================
 def select_network(api_key, organization_id):
-    networks = get_meraki_networks(api_key, organization_id)
-    if networks:
-        for idx, network in enumerate(networks, 1):
+    # Networks are printed as soon as each page arrives
+    networks = []
+    try:
+        for idx, network in enumerate(iter_meraki_networks(api_key, organization_id), 1):
             print(f"{idx}. {network['name']}")
+            networks.append(network)
+    except MerakiAPIError:
+        print("Failed to fetch networks")
 
+    if networks:
         choice = input(colored("\nSelect an Organization Network (enter the number): ", "cyan"))
         try:
             selected_index = int(choice) - 1
@@ -195,17 +945,124 @@ def select_network(api_key, organization_id):
     return None
 
 
+# ==================================================
+# GET the Organization wide Device inventory
+# ==================================================
+def iter_organization_devices(api_key, organization_id, product_types=None, network_ids=None, per_page=1000):
+    params = {}
+    if product_types:
+        params["productTypes[]"] = list(product_types)
+    if network_ids:
+        params["networkIds[]"] = list(network_ids)
+
+    for device in iter_pages(api_key, "/organizations/{organization_id}/devices", params, per_page, organization_id=organization_id):
+        remember_organization(organization_id, network_ids=[device['networkId']] if device.get('networkId') else [], serials=[device['serial']])
+        yield device
+
+class OrganizationInventory:
+    """
+    In-memory index of the devices of an Organization by model and tag,
+    built from a single paginated inventory download.
+    """
+    def __init__(self, organization_id, devices):
+        self.organization_id = organization_id
+        self.devices = devices
+        self.by_model = {}
+        self.by_tag = {}
+        for device in devices:
+            self.by_model.setdefault(device.get('model'), []).append(device)
+            for tag in device.get('tags') or []:
+                self.by_tag.setdefault(tag, []).append(device)
+
+    def __len__(self):
+        return len(self.devices)
+
+    def select(self, models=None, tags=None):
+        # Devices of any of 'models' that carry any of 'tags', in inventory order
+        devices = self.devices
+        if models:
+            serials = {device['serial'] for model in models for device in self.by_model.get(model, [])}
+            devices = [device for device in devices if device['serial'] in serials]
+        if tags:
+            serials = {device['serial'] for tag in tags for device in self.by_tag.get(tag, [])}
+            devices = [device for device in devices if device['serial'] in serials]
+        return devices
+
+def get_organization_inventory(api_key, organization_id, product_types=None, network_ids=None):
+    devices = from_mirror(api_key, "devices", organization_id)
+    if devices is not MISSING:
+        devices = [device for device in devices
+                   if (not product_types or device.get('productType') in product_types)
+                   and (not network_ids or device.get('networkId') in network_ids)]
+        return OrganizationInventory(organization_id, devices)
+
+    try:
+        devices = list(iter_organization_devices(api_key, organization_id, product_types, network_ids))
+    except MerakiAPIError as e:
+        print(f"Failed to fetch organization devices. Status code: {e.status_code}")
+        return None
+    return OrganizationInventory(organization_id, devices)
+
+
+# ==================================================
+# INDEX the Devices of a Network by product family
+# ==================================================
+PRODUCT_FAMILIES = ("MS", "MR", "MX", "MV", "MT", "MG")
+
+network_device_index = {}
+
+def build_device_index(devices):
+    index = {family: [] for family in PRODUCT_FAMILIES}
+    for device in devices:
+        index.setdefault((device.get('model') or '')[:2], []).append(device)
+    return index
+
+def fetch_network_device_index(api_key, network_id):
+    response = client.get(api_key, "/networks/{network_id}/devices", network_id=network_id)
+    if response.status_code != 200:
+        print(f"Failed to fetch devices, status code: {response.status_code}")
+        return None
+
+    devices = decode_json(response)
+    remember_organization(organization_of.get(network_id), serials=[device['serial'] for device in devices])
+    persist(api_key, "/networks/{network_id}/devices", devices, response.headers.get("ETag"), network_id=network_id)
+    network_device_index[network_id] = build_device_index(devices)
+    return network_device_index[network_id]
+
+def get_network_device_index(api_key, network_id, refresh=False):
+    """
+    Devices of a Network fetched once and partitioned by model prefix
+    (MS, MR, MX, MV, MT, MG). Pass refresh=True to download them again.
+    """
+    if refresh:
+        return fetch_network_device_index(api_key, network_id)
+    prefetcher.wait(("devices", api_key, network_id))
+    if network_id in network_device_index:
+        return network_device_index[network_id]
+
+    devices = from_mirror(api_key, "network_devices", network_id)
+    if devices is not MISSING:
+        network_device_index[network_id] = build_device_index(devices)
+        return network_device_index[network_id]
+
+    devices = load_persisted(api_key, "/networks/{network_id}/devices", network_id=network_id)
+    if devices is not MISSING:
+        network_device_index[network_id] = build_device_index(devices)
+        revalidate_in_background(("devices", api_key, network_id), lambda: fetch_network_device_index(api_key, network_id))
+        return network_device_index[network_id]
+    return fetch_network_device_index(api_key, network_id)
+
+def reset_network_device_index(network_id):
+    network_device_index.pop(network_id, None)
+
+
 # ==================================================
 # GET a list of Switches in an Network
 # ==================================================
 def get_meraki_switches(api_key, network_id):
-    url = f"https://api.meraki.com/api/v1/networks/{network_id}/devices"
-    headers = {"X-Cisco-Meraki-API-Key": api_key, "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        devices = response.json()
-        switches = [device for device in devices if device['model'].startswith('MS')]
-        return switches
+    index = get_network_device_index(api_key, network_id)
+    if index is not None:
+        return list(index['MS'])
     else:
         print("Failed to fetch switches")
         return None
@@ -221,25 +1078,29 @@ def display_switches(api_key, network_id):
 # ==================================================
 # GET a list of Switch Ports and their Status
 # ==================================================
-def get_switch_ports(api_key, serial):
-    url = f"https://api.meraki.com/api/v1/devices/{serial}/switch/ports"
-    headers = {"X-Cisco-Meraki-API-Key": api_key, "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
+def fetch_switch_ports(api_key, serial):
+    response = client.get(api_key, "/devices/{serial}/switch/ports", serial=serial)
     if response.status_code == 200:
-        return response.json()
+        return decode_json(response)
     else:
         print(f"Failed to fetch switch ports for serial {serial}, status code: {response.status_code}")
         return None 
+
+def get_switch_ports(api_key, serial):
+    ports = from_mirror(api_key, "switch_ports", serial)
+    if ports is not MISSING:
+        return ports
+    ports = fetch_switch_ports(api_key, serial)
+    record_in_mirror(api_key, "switch_ports", serial, ports)
+    return ports
     
 def get_switch_ports_statuses_with_timespan(api_key, serial, timespan=1800):
-    url = f"https://api.meraki.com/api/v1/devices/{serial}/switch/ports/statuses"
-    headers = {"X-Cisco-Meraki-API-Key": api_key, "Content-Type": "application/json"}
     # Assuming the API supports a 'timespan' query parameter for this endpoint
     params = {'timespan': timespan}
 
-    response = requests.get(url, headers=headers, params=params)
+    response = client.get(api_key, "/devices/{serial}/switch/ports/statuses", params, serial=serial)
     if response.status_code == 200:
-        return response.json()
+        return decode_json(response)
     else:
         print(f"Failed to fetch switch ports for serial {serial}, status code: {response.status_code}")
         return None 
@@ -249,14 +1110,9 @@ def get_switch_ports_statuses_with_timespan(api_key, serial, timespan=1800):
 # GET a list of Access Points in an Network
 # ==================================================
 def get_meraki_access_points(api_key, network_id):
-    url = f"https://api.meraki.com/api/v1/networks/{network_id}/devices"
-    headers = {"X-Cisco-Meraki-API-Key": api_key, "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        devices = response.json()
-        # Filter to include only access points (APs)
-        access_points = [device for device in devices if device['model'].startswith('MR')]
-        return access_points
+    index = get_network_device_index(api_key, network_id)
+    if index is not None:
+        return list(index['MR'])
     else:
         print("Failed to fetch access points")
         return None
@@ -266,21 +1122,17 @@ def get_meraki_access_points(api_key, network_id):
 # [UNDER DEVELOPMENT] GET a list of VLANs and Static Routes in an Network
 # =======================================================================
 def get_meraki_vlans(api_key, network_id):
-    url = f"https://api.meraki.com/api/v1/networks/{network_id}/vlans"
-    headers = {"X-Cisco-Meraki-API-Key": api_key, "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
+    response = client.get(api_key, "/networks/{network_id}/vlans", network_id=network_id)
     if response.status_code == 200:
-        return response.json()
+        return decode_json(response)
     else:
         print(f"Failed to fetch VLANs: {response.status_code}, {response.text}")
         return None
 
 def get_meraki_static_routes(api_key, network_id):
-    url = f"https://api.meraki.com/api/v1/networks/{network_id}/staticRoutes"
-    headers = {"X-Cisco-Meraki-API-Key": api_key, "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
+    response = client.get(api_key, "/networks/{network_id}/staticRoutes", network_id=network_id)
     if response.status_code == 200:
-        return response.json()
+        return decode_json(response)
     else:
         print(f"Failed to fetch static routes: {response.status_code}, {response.text}")
         return None
@@ -290,11 +1142,16 @@ def get_meraki_static_routes(api_key, network_id):
 # SELECT a Network in an Organization
 # ==================================================
 def select_mx_network(api_key, organization_id):
-    networks = get_meraki_networks(api_key, organization_id)
-    if networks:
-        for idx, network in enumerate(networks, 1):
+    # Networks are printed as soon as each page arrives
+    networks = []
+    try:
+        for idx, network in enumerate(iter_meraki_networks(api_key, organization_id), 1):
             print(f"{idx}. {network['name']}")
+            networks.append(network)
+    except MerakiAPIError:
+        print("Failed to fetch networks")
 
+    if networks:
         choice = input(colored("\nSelect an Organization Network (enter the number): ", "cyan"))
         try:
             selected_index = int(choice) - 1
@@ -311,16 +1168,22 @@ def select_mx_network(api_key, organization_id):
 # ==================================================
 # GET Layer 3 Firewall Rules for a Network
 # ==================================================
-def get_l3_firewall_rules(api_key, network_id):
-    url = f"https://api.meraki.com/api/v1/networks/{network_id}/appliance/firewall/l3FirewallRules"
-    headers = {"X-Cisco-Meraki-API-Key": api_key, "Content-Type": "application/json"}
-    response = requests.get(url, headers=headers)
+def fetch_l3_firewall_rules(api_key, network_id):
+    response = client.get(api_key, "/networks/{network_id}/appliance/firewall/l3FirewallRules", network_id=network_id)
     if response.status_code == 200:
-        return response.json()["rules"]
+        return decode_json(response)["rules"]
     else:
         print("Failed to fetch L3 firewall rules")
         return None
 
+def get_l3_firewall_rules(api_key, network_id):
+    rules = from_mirror(api_key, "l3_rules", network_id)
+    if rules is not MISSING:
+        return rules
+    rules = fetch_l3_firewall_rules(api_key, network_id)
+    record_in_mirror(api_key, "l3_rules", network_id, rules)
+    return rules
+
 
 # ==================================================
 # DISPLAY Firewall Rules in a Table Format
@@ -337,32 +1200,28 @@ def display_firewall_rules(firewall_rules):
 # FETCH Organization policy and group objects for Firewall Rules
 # ==============================================================
 def get_organization_policy_objects(api_key, organization_id):
-    url = f"https://api.meraki.com/api/v1/organizations/{organization_id}/policyObjects"
-    headers = {
-        "X-Cisco-Meraki-API-Key": api_key,
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
-    response = requests.get(url, headers=headers)
+    data = cache.get("policy_objects", api_key, organization_id)
+    if data is not MISSING:
+        return data
+
+    response = client.get(api_key, "/organizations/{organization_id}/policyObjects", organization_id=organization_id)
     if response.status_code == 200:
-        data = response.json()
-        print("Policy Objects:", data[:5])
+        data = decode_json(response)
+        cache.set("policy_objects", api_key, organization_id, data)
         return data
     else:
         print(f"Failed to fetch organization policy objects: {response.text}")
         return []
 
 def get_organization_policy_objects_groups(api_key, organization_id):
-    url = f"https://api.meraki.com/api/v1/organizations/{organization_id}/policyObjects/groups"
-    headers = {
-        "X-Cisco-Meraki-API-Key": api_key,
-        "Content-Type": "application/json",
-        "Accept": "application/json"
-    }
-    response = requests.get(url, headers=headers)
+    data = cache.get("policy_objects_groups", api_key, organization_id)
+    if data is not MISSING:
+        return data
+
+    response = client.get(api_key, "/organizations/{organization_id}/policyObjects/groups", organization_id=organization_id)
     if response.status_code == 200:
-        data = response.json()
-        print("Policy Objects Groups:", data[:5])
+        data = decode_json(response)
+        cache.set("policy_objects_groups", api_key, organization_id, data)
         return data
     else:
         print(f"Failed to fetch organization policy objects groups: {response.text}")
@@ -372,16 +1231,50 @@ def get_organization_policy_objects_groups(api_key, organization_id):
 # ==============================================================
 # FETCH Organization Devices Statuses
 # ==============================================================
-def get_organization_devices_statuses(api_key, organization_id):
-    url = f"https://api.meraki.com/api/v1/organizations/{organization_id}/devices/statuses"
-    headers = {
-        "X-Cisco-Meraki-API-Key": api_key,
-        "Content-Type": "application/json"
-    }
-
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        print(f"Failed to fetch organization devices statuses. Status code: {response.status_code}")
-        return []
\ No newline at end of file
+def iter_organization_devices_statuses(api_key, organization_id, network_ids=None, product_types=None, per_page=1000, stream=False):
+    # Filters are applied by the API so only the matching devices are downloaded
+    params = {}
+    if network_ids:
+        params["networkIds[]"] = list(network_ids)
+    if product_types:
+        params["productTypes[]"] = list(product_types)
+    return iter_pages(api_key, "/organizations/{organization_id}/devices/statuses", params, per_page, stream, organization_id=organization_id)
+
+# Product types of the statuses the network menu shows
+NETWORK_STATUS_PRODUCT_TYPES = ("switch", "wireless")
+
+def fetch_organization_devices_statuses(api_key, organization_id, network_ids=(), product_types=()):
+    statuses = list(iter_organization_devices_statuses(api_key, organization_id, network_ids, product_types))
+    cache.set("statuses", api_key, organization_id, network_ids, product_types, statuses)
+    return statuses
+
+def get_organization_devices_statuses(api_key, organization_id, network_ids=None, product_types=None):
+    statuses = from_mirror(api_key, "statuses", organization_id)
+    if statuses is not MISSING:
+        return [status for status in statuses
+                if (not network_ids or status.get('networkId') in network_ids)
+                and (not product_types or status.get('productType') in product_types)]
+
+    network_ids = tuple(network_ids or ())
+    product_types = tuple(product_types or ())
+    prefetcher.wait(("statuses", api_key, organization_id, network_ids, product_types))
+    statuses = cache.get("statuses", api_key, organization_id, network_ids, product_types)
+    if statuses is not MISSING:
+        return statuses
+
+    try:
+        return fetch_organization_devices_statuses(api_key, organization_id, network_ids, product_types)
+    except MerakiAPIError as e:
+        print(f"Failed to fetch organization devices statuses. Status code: {e.status_code}")
+        return []
+
+
+# ==================================================
+# FETCH Organization Uplinks Statuses
+# ==================================================
+def iter_organization_uplinks_statuses(api_key, organization_id, network_ids=None, per_page=1000):
+    # One entry per MX, MG and Z appliance, each with the state of all its uplinks
+    params = {}
+    if network_ids:
+        params["networkIds[]"] = list(network_ids)
+    return iter_pages(api_key, "/organizations/{organization_id}/uplinks/statuses", params, per_page, organization_id=organization_id)
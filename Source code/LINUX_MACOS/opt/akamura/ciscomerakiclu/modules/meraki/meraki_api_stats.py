@@ -0,0 +1,151 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import json
+import math
+import threading
+from collections import Counter, deque
+from tabulate import tabulate
+
+
+# ==================================================
+# MEASURE calls, volume and latency per endpoint
+# ==================================================
+# Latency samples kept per endpoint for the percentiles
+MAX_SAMPLES = 10000
+
+class EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.statuses = Counter()
+        self.bytes_received = 0
+        self.retries = 0
+        self.throttle_wait = 0.0
+        self.total_seconds = 0.0
+        self.latencies = deque(maxlen=MAX_SAMPLES)
+
+    def percentile(self, share):
+        # Nearest-rank percentile over the retained samples
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(share * len(ordered)) - 1)]
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "bytes_received": self.bytes_received,
+            "retries": self.retries,
+            "throttle_wait_seconds": round(self.throttle_wait, 3),
+            "total_seconds": round(self.total_seconds, 3),
+            "p50_seconds": round(self.percentile(0.50), 3),
+            "p95_seconds": round(self.percentile(0.95), 3),
+            "p99_seconds": round(self.percentile(0.99), 3)
+        }
+
+class ApiStats:
+    """
+    Session wide counters keyed by endpoint template, e.g. /devices/{serial}/switch/ports,
+    so that the thousand serials of a sweep add up on a single row. Latency covers the
+    whole call, retries and rate limiter waits included, which are also reported apart.
+    """
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, status, seconds, bytes_received=0, retries=0, throttle_wait=0.0):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.calls += 1
+            stats.statuses[status] += 1
+            stats.bytes_received += bytes_received
+            stats.retries += retries
+            stats.throttle_wait += throttle_wait
+            stats.total_seconds += seconds
+            stats.latencies.append(seconds)
+
+    def record_retry_status(self, endpoint, status):
+        # Statuses answered to attempts that were retried (429, 5xx)
+        with self._lock:
+            self._endpoints.setdefault(endpoint, EndpointStats()).statuses[status] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {endpoint: stats.as_dict() for endpoint, stats in sorted(self._endpoints.items())}
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+api_stats = ApiStats()
+
+
+# ==================================================
+# PRINT and DUMP the collected statistics
+# ==================================================
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def print_summary(file=None):
+    endpoints = api_stats.as_dict()
+    if not endpoints:
+        print("No Meraki API calls were made in this session.", file=file)
+        return
+
+    headers = ["Endpoint", "Calls", "Statuses", "Received", "Retries", "Throttled (s)", "Total (s)", "p50 (s)", "p95 (s)", "p99 (s)"]
+    rows = [[
+        endpoint,
+        stats["calls"],
+        " ".join(f"{status}:{count}" for status, count in stats["statuses"].items()),
+        format_bytes(stats["bytes_received"]),
+        stats["retries"],
+        f"{stats['throttle_wait_seconds']:.2f}",
+        f"{stats['total_seconds']:.2f}",
+        f"{stats['p50_seconds']:.3f}",
+        f"{stats['p95_seconds']:.3f}",
+        f"{stats['p99_seconds']:.3f}"
+    ] for endpoint, stats in endpoints.items()]
+
+    print("\nMERAKI API STATISTICS", file=file)
+    print(tabulate(rows, headers=headers, tablefmt="fancy_grid"), file=file)
+
+def dump_json(file_path):
+    with open(file_path, 'w') as file:
+        json.dump(api_stats.as_dict(), file, indent=2)
@@ -0,0 +1,268 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import time
+import logging
+import threading
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ==================================================
+# IMPORT custom modules
+# ==================================================
+from modules.meraki import meraki_api
+
+
+# ==================================================
+# DEFINE the exported metrics
+# ==================================================
+EXPORTER_HOST = "127.0.0.1"
+EXPORTER_PORT = 9823
+POLL_INTERVAL = 300
+
+DEVICE_STATUSES = ("online", "alerting", "offline", "dormant")
+UPLINK_STATUSES = ("active", "ready", "connecting", "not connected", "failed")
+
+METRICS = {
+    "meraki_device_up": ("gauge", "1 if the device is online, 0 otherwise."),
+    "meraki_device_status": ("gauge", "Current status of the device, 1 for the active status label."),
+    "meraki_device_power_supply_up": ("gauge", "1 if the power supply is powering, 0 otherwise."),
+    "meraki_uplink_up": ("gauge", "1 if the appliance uplink is active, 0 otherwise."),
+    "meraki_uplink_status": ("gauge", "Current status of the appliance uplink, 1 for the active status label."),
+    "meraki_exporter_devices": ("gauge", "Devices reported by the last successful poll."),
+    "meraki_exporter_poll_duration_seconds": ("gauge", "Duration of the last poll of the Organization."),
+    "meraki_exporter_last_success_timestamp_seconds": ("gauge", "Unix time of the last successful poll of the Organization."),
+    "meraki_exporter_poll_errors_total": ("counter", "Polls of the Organization that failed.")
+}
+
+logger = logging.getLogger('ciscomerakiclu')
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render_metrics(samples):
+    # Prometheus text exposition format 0.0.4, families in the order of METRICS
+    by_metric = {}
+    for metric, labels, value in samples:
+        by_metric.setdefault(metric, []).append((labels, value))
+
+    lines = []
+    for metric, (kind, description) in METRICS.items():
+        if metric not in by_metric:
+            continue
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for labels, value in by_metric[metric]:
+            label_text = ",".join(f'{key}="{escape_label(val)}"' for key, val in labels.items() if val is not None)
+            lines.append(f"{metric}{{{label_text}}} {value}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# ==================================================
+# CONVERT API responses into samples
+# ==================================================
+def device_samples(organization_id, statuses):
+    for device in statuses:
+        labels = {
+            "organization_id": organization_id,
+            "network_id": device.get("networkId"),
+            "serial": device.get("serial"),
+            "name": device.get("name") or "",
+            "model": device.get("model"),
+            "product_type": device.get("productType")
+        }
+        status = (device.get("status") or "").lower()
+        yield "meraki_device_up", labels, int(status == "online")
+        for known_status in DEVICE_STATUSES:
+            yield "meraki_device_status", dict(labels, status=known_status), int(status == known_status)
+
+        for power_supply in device.get("components", {}).get("powerSupplies", []):
+            power_labels = {
+                "organization_id": organization_id,
+                "serial": device.get("serial"),
+                "slot": power_supply.get("slot"),
+                "model": power_supply.get("model")
+            }
+            yield "meraki_device_power_supply_up", power_labels, int((power_supply.get("status") or "").lower() == "powering")
+
+def uplink_samples(organization_id, appliances):
+    for appliance in appliances:
+        for uplink in appliance.get("uplinks", []):
+            labels = {
+                "organization_id": organization_id,
+                "network_id": appliance.get("networkId"),
+                "serial": appliance.get("serial"),
+                "model": appliance.get("model"),
+                "interface": uplink.get("interface")
+            }
+            status = (uplink.get("status") or "").lower()
+            yield "meraki_uplink_up", labels, int(status == "active")
+            for known_status in UPLINK_STATUSES:
+                yield "meraki_uplink_status", dict(labels, status=known_status), int(status == known_status)
+
+
+# ==================================================
+# POLL the Organizations in the background
+# ==================================================
+class MetricsExporter:
+    """
+    Polls every Organization one after the other on a fixed schedule, through the
+    shared client and therefore inside the per-Organization rate limit. Each poll
+    renders a complete payload that scrapes are answered with, so a scrape never
+    waits on the Dashboard API. An Organization that fails to poll keeps its last
+    samples, and its last success timestamp tells how stale they are.
+    """
+    def __init__(self, api_key, organization_ids=None, interval=POLL_INTERVAL):
+        self.api_key = api_key
+        self.organization_ids = list(organization_ids or [])
+        self.interval = interval
+        self.samples = {}
+        self.health = {}
+        self.payload = render_metrics([])
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def organizations(self):
+        if self.organization_ids:
+            return self.organization_ids
+        organizations = meraki_api.get_meraki_organizations(self.api_key) or []
+        return [organization['id'] for organization in organizations]
+
+    def poll_organization(self, organization_id):
+        health = self.health.setdefault(organization_id, {"errors": 0, "last_success": None, "duration": 0.0, "devices": 0})
+        started = time.monotonic()
+        try:
+            statuses = list(meraki_api.iter_organization_devices_statuses(self.api_key, organization_id))
+            appliances = list(meraki_api.iter_organization_uplinks_statuses(self.api_key, organization_id))
+        except (meraki_api.MerakiAPIError, requests.exceptions.RequestException) as e:
+            health["errors"] += 1
+            logger.error(f"Exporter failed to poll organization {organization_id}: {e}")
+            return
+        finally:
+            health["duration"] = time.monotonic() - started
+
+        self.samples[organization_id] = list(device_samples(organization_id, statuses)) + list(uplink_samples(organization_id, appliances))
+        health["last_success"] = time.time()
+        health["devices"] = len(statuses)
+
+    def health_samples(self):
+        for organization_id, health in self.health.items():
+            labels = {"organization_id": organization_id}
+            yield "meraki_exporter_devices", labels, health["devices"]
+            yield "meraki_exporter_poll_duration_seconds", labels, round(health["duration"], 3)
+            if health["last_success"] is not None:
+                yield "meraki_exporter_last_success_timestamp_seconds", labels, round(health["last_success"], 3)
+            yield "meraki_exporter_poll_errors_total", labels, health["errors"]
+
+    def poll(self):
+        for organization_id in self.organizations():
+            if self._stop.is_set():
+                return
+            self.poll_organization(organization_id)
+            self.publish()
+
+    def publish(self):
+        samples = [sample for organization_samples in self.samples.values() for sample in organization_samples]
+        payload = render_metrics(samples + list(self.health_samples()))
+        with self._lock:
+            self.payload = payload
+
+    def run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.poll()
+            except Exception:
+                logger.error("Exporter poll failed", exc_info=True)
+            self._stop.wait(max(0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        threading.Thread(target=self.run, name="meraki-exporter", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def current_payload(self):
+        with self._lock:
+            return self.payload
+
+
+# ==================================================
+# SERVE the metrics over HTTP
+# ==================================================
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    exporter = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body = self.exporter.current_payload()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+            status = 200
+        elif self.path == "/":
+            body = b'<html><body><h1>Cisco Meraki CLU Exporter</h1><p><a href="/metrics">Metrics</a></p></body></html>'
+            content_type = "text/html"
+            status = 200
+        else:
+            body = b"Not found\n"
+            content_type = "text/plain"
+            status = 404
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def serve_metrics(exporter, host=EXPORTER_HOST, port=EXPORTER_PORT):
+    handler = type("BoundMetricsRequestHandler", (MetricsRequestHandler,), {"exporter": exporter})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="meraki-exporter-http", daemon=True).start()
+    return server
+
+def run_exporter(api_key, organization_ids=None, host=EXPORTER_HOST, port=EXPORTER_PORT, interval=POLL_INTERVAL):
+    exporter = MetricsExporter(api_key, organization_ids, interval)
+    server = serve_metrics(exporter, host, port)
+    exporter.start()
+    print(f"Serving Cisco Meraki metrics on http://{host}:{port}/metrics, polling every {interval} seconds. Press Ctrl+C to stop.")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        exporter.stop()
+        server.shutdown()
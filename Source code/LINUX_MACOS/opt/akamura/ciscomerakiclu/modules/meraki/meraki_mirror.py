@@ -0,0 +1,322 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import time
+import threading
+from datetime import datetime, timezone
+from rich.console import Console
+from rich.table import Table
+from rich.box import SIMPLE
+
+
+# ==================================================
+# IMPORT custom modules
+# ==================================================
+from modules.meraki import meraki_api
+from modules.meraki.meraki_api import MISSING, account_of, remember_organization
+from modules.meraki.meraki_api_stats import api_stats
+from utilities import tracing
+
+
+# ==================================================
+# DEFINE the local mirror of Organizations
+# ==================================================
+MIRROR_ENDPOINT = "mirror"
+PORTS_ENDPOINT = "mirror/switch_ports"
+L3_RULES_ENDPOINT = "mirror/l3_rules"
+# The availability change history only goes back 31 days, older mirrors are downloaded again
+MAX_INCREMENTAL_AGE = 30 * 24 * 3600
+# The next t0 starts this many seconds before the sync, changes indexed late are not missed
+WATERMARK_OVERLAP = 60
+# Mirrors older than this are synced again before they are read
+MIRROR_MAX_AGE = 15 * 60
+NETWORK_IDS_PER_REQUEST = 100
+
+def iso_timestamp(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def api_calls():
+    return sum(sum(stats["statuses"].values()) for stats in api_stats.as_dict().values())
+
+def chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class OrganizationMirror:
+    """
+    Networks, devices and statuses of the mirrored Organizations kept in the
+    response store and brought up to date from the configuration change log
+    and the device availability history, so only what changed is downloaded
+    again. Switch ports and L3 rules are mirrored the first time they are read.
+    A mirror older than MIRROR_MAX_AGE is synced before it is read.
+    """
+    def __init__(self, store):
+        self.store = store
+        self._documents = {}
+        self._ports = {}
+        self._l3_rules = {}
+        self._network_owner = {}
+        self._serial_owner = {}
+        self._loaded = set()
+        self._lock = threading.RLock()
+
+    def _load(self, api_key):
+        account = account_of(api_key)
+        with self._lock:
+            if account in self._loaded:
+                return account
+            for params, entry in self.store.find(account, MIRROR_ENDPOINT):
+                self._index(account, params["organization_id"], entry["body"])
+            for params, entry in self.store.find(account, PORTS_ENDPOINT):
+                self._ports[(account, params["serial"])] = entry["body"]
+            for params, entry in self.store.find(account, L3_RULES_ENDPOINT):
+                self._l3_rules[(account, params["network_id"])] = entry["body"]
+            self._loaded.add(account)
+        return account
+
+    def _index(self, account, organization_id, document):
+        self._documents[(account, organization_id)] = document
+        network_ids = [network["id"] for network in document["networks"]]
+        for network_id in network_ids:
+            self._network_owner[(account, network_id)] = organization_id
+        for serial in document["devices"]:
+            self._serial_owner[(account, serial)] = organization_id
+        remember_organization(organization_id, network_ids=network_ids, serials=list(document["devices"]))
+
+    def _save(self, account, organization_id, document):
+        self.store.put(account, MIRROR_ENDPOINT, {"organization_id": organization_id}, document)
+        self._index(account, organization_id, document)
+
+    def organizations(self, api_key):
+        account = self._load(api_key)
+        with self._lock:
+            return [organization_id for (owner, organization_id) in self._documents if owner == account]
+
+    # ==================================================
+    # READ resources of a mirrored Organization
+    # ==================================================
+    def lookup(self, api_key, resource, key):
+        account = self._load(api_key)
+        with self._lock:
+            if resource in ("networks", "devices", "statuses"):
+                organization_id = key
+            elif resource in ("network_devices", "l3_rules"):
+                organization_id = self._network_owner.get((account, key))
+            else:
+                organization_id = self._serial_owner.get((account, key))
+            document = self._current(api_key, account, organization_id)
+            if document is None:
+                return MISSING
+
+            if resource == "networks":
+                return list(document["networks"])
+            if resource == "devices":
+                return list(document["devices"].values())
+            if resource == "statuses":
+                return list(document["statuses"].values())
+            if resource == "network_devices":
+                if not any(network["id"] == key for network in document["networks"]):
+                    return MISSING
+                return [device for device in document["devices"].values() if device.get("networkId") == key]
+
+            # Entries of an earlier full download are no longer trusted
+            entries = self._ports if resource == "switch_ports" else self._l3_rules
+            entry = entries.get((account, key))
+            if entry is None or entry["generation"] != document["generation"]:
+                return MISSING
+            if resource == "switch_ports" and key not in document["devices"]:
+                return MISSING
+            return entry["value"]
+
+    def _current(self, api_key, account, organization_id):
+        # The lock is held through the sync, other readers wait for it instead of syncing too
+        with self._lock:
+            document = self._documents.get((account, organization_id))
+            if document is None:
+                return None
+            if time.time() - document["synced_at"] <= MIRROR_MAX_AGE and document["synced_at"] > meraki_api.cleared_at:
+                return document
+            try:
+                with tracing.span("Sync Organization Mirror", organization_id=organization_id):
+                    self.sync(api_key, organization_id)
+            except meraki_api.MerakiAPIError:
+                # Read live instead of from an outdated mirror
+                return None
+            return self._documents.get((account, organization_id))
+
+    def record(self, api_key, resource, key, value):
+        # Ports and rules read while the Organization is mirrored are kept for next time
+        account = self._load(api_key)
+        with self._lock:
+            if resource == "switch_ports":
+                organization_id = self._serial_owner.get((account, key))
+            else:
+                organization_id = self._network_owner.get((account, key))
+            document = self._documents.get((account, organization_id))
+            if document is None:
+                return
+            self._store_entry(account, resource, key, document, value)
+
+    def _store_entry(self, account, resource, key, document, value):
+        entry = {"generation": document["generation"], "value": value}
+        if resource == "switch_ports":
+            entry["network_id"] = document["devices"][key].get("networkId")
+            self._ports[(account, key)] = entry
+            self.store.put(account, PORTS_ENDPOINT, {"serial": key}, entry)
+        else:
+            self._l3_rules[(account, key)] = entry
+            self.store.put(account, L3_RULES_ENDPOINT, {"network_id": key}, entry)
+
+    # ==================================================
+    # SYNC a mirrored Organization with the Dashboard
+    # ==================================================
+    def sync(self, api_key, organization_id, full=False):
+        """
+        Bring the mirror of an Organization up to date and return what it cost.
+        The first sync downloads everything, later ones only the networks named
+        in the change log since the previous sync. Raises MerakiAPIError.
+        """
+        account = self._load(api_key)
+        started = time.time()
+        calls = api_calls()
+        with self._lock:
+            document = self._documents.get((account, organization_id))
+
+        incremental = document is not None and not full and started - document["synced_at"] < MAX_INCREMENTAL_AGE
+        if incremental:
+            document = dict(document)
+            changed_networks = self._sync_changes(api_key, account, organization_id, document)
+        else:
+            document = self._download(api_key, organization_id, started)
+            changed_networks = None
+
+        document["t0"] = iso_timestamp(started - WATERMARK_OVERLAP)
+        document["synced_at"] = started
+        with self._lock:
+            self._save(account, organization_id, document)
+
+        return {
+            "organization_id": organization_id,
+            "mode": "incremental" if incremental else "full",
+            "networks": len(document["networks"]),
+            "devices": len(document["devices"]),
+            "changed_networks": len(changed_networks) if changed_networks is not None else len(document["networks"]),
+            "requests": api_calls() - calls,
+            "seconds": round(time.time() - started, 2)
+        }
+
+    def _download(self, api_key, organization_id, started):
+        return {
+            "generation": started,
+            "networks": list(meraki_api.fetch_meraki_networks(api_key, organization_id)),
+            "devices": {device["serial"]: device for device in meraki_api.iter_organization_devices(api_key, organization_id)},
+            "statuses": {status["serial"]: status for status in meraki_api.iter_organization_devices_statuses(api_key, organization_id)}
+        }
+
+    def _sync_changes(self, api_key, account, organization_id, document):
+        changes = meraki_api.collect_pages(api_key, "/organizations/{organization_id}/configurationChanges", {"t0": document["t0"]}, 5000, organization_id=organization_id)
+        availabilities = meraki_api.collect_pages(api_key, "/organizations/{organization_id}/devices/availabilities/changeHistory", {"t0": document["t0"]}, 1000, organization_id=organization_id)
+
+        changed_networks = set()
+        if changes:
+            # Networks may have been added, renamed or removed
+            document["networks"] = list(meraki_api.fetch_meraki_networks(api_key, organization_id))
+            network_ids = {network["id"] for network in document["networks"]}
+            changed_networks = {change["networkId"] for change in changes if change.get("networkId") in network_ids}
+            devices = {serial: device for serial, device in document["devices"].items() if device.get("networkId") in network_ids and device.get("networkId") not in changed_networks}
+            statuses = {serial: status for serial, status in document["statuses"].items() if serial in devices}
+
+            # Both lists are filtered by the API, a hundred networks per request
+            for network_ids_chunk in chunks(changed_networks, NETWORK_IDS_PER_REQUEST):
+                for device in meraki_api.iter_organization_devices(api_key, organization_id, network_ids=network_ids_chunk):
+                    devices[device["serial"]] = device
+                for status in meraki_api.iter_organization_devices_statuses(api_key, organization_id, network_ids_chunk):
+                    statuses[status["serial"]] = status
+            for network_id in changed_networks:
+                meraki_api.reset_network_device_index(network_id)
+            document["devices"] = devices
+            document["statuses"] = statuses
+            self._drop_details(account, changed_networks)
+
+        # Devices that went up or down without any configuration change
+        statuses = document["statuses"] = dict(document["statuses"])
+        for event in availabilities:
+            serial = (event.get("device") or {}).get("serial")
+            new = {detail.get("name"): detail.get("value") for detail in (event.get("details") or {}).get("new", [])}
+            if serial in statuses and new.get("status"):
+                statuses[serial] = dict(statuses[serial], status=new["status"])
+        return changed_networks
+
+    def _drop_details(self, account, changed_networks):
+        # Rules and ports of changed networks are downloaded again the next time they are read
+        with self._lock:
+            for network_id in changed_networks:
+                if self._l3_rules.pop((account, network_id), None) is not None:
+                    self.store.delete(account, L3_RULES_ENDPOINT, {"network_id": network_id})
+            for (owner, serial), entry in list(self._ports.items()):
+                if owner == account and entry["network_id"] in changed_networks:
+                    del self._ports[(owner, serial)]
+                    self.store.delete(account, PORTS_ENDPOINT, {"serial": serial})
+
+
+# ==================================================
+# SYNC several Organizations and show what it cost
+# ==================================================
+SYNC_COLUMNS = ("organization_id", "mode", "networks", "devices", "changed_networks", "requests", "seconds", "error")
+
+def sync_organizations(api_key, organization_ids, full=False, progress=None):
+    results = []
+    for organization_id in organization_ids:
+        with tracing.span("Sync Organization Mirror", organization_id=organization_id):
+            try:
+                result = dict(meraki_api.mirror.sync(api_key, organization_id, full), error="")
+            except meraki_api.MerakiAPIError as e:
+                result = {"organization_id": organization_id, "error": f"status code {e.status_code}"}
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
+
+def display_sync_results(results):
+    table = Table(show_header=True, header_style="bold green", box=SIMPLE)
+    for column in SYNC_COLUMNS:
+        table.add_column(column.replace("_", " ").upper())
+    for result in results:
+        table.add_row(*[str(result.get(column, "")) for column in SYNC_COLUMNS], style="red" if result.get("error") else "")
+
+    console = Console()
+    with tracing.span("render table", "render"):
+        console.print(table)
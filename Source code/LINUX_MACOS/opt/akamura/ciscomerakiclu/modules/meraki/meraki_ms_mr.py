@@ -33,6 +33,7 @@
 # IMPORT various libraries and modules
 # ==================================================
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from termcolor import colored
 from rich.console import Console
 from rich.table import Table
@@ -44,11 +45,39 @@ from rich.box import SIMPLE
 # ==================================================
 from modules.meraki import meraki_api 
 from settings import term_extra
+from utilities import tracing
 
 
 # ==================================================
 # DEFINE how to retrieve Switch Ports data
 # ==================================================
+PORT_COLUMNS = [
+    ("Port", 5), ("Name", 30), ("Enabled", 5),
+    ("PoE", 5), ("Type", 10), ("VLAN", 5),
+    ("Allowed VLANs", 8), ("RSTP", 5), ("STP Guard", 10),
+    ("Storm Cont", 5), ("In (Gbps)", 8), ("Out (Gbps)", 8),
+    ("powerUsageInWh", 8), ("warnings", 30), ("errors", 30)
+]
+
+def port_row(port, status):
+    return [
+        port.get('portId', 'N/A'),
+        port.get('name', 'N/A'),
+        "Yes" if port.get('enabled') else "No",
+        "Yes" if port.get('poeEnabled') else "No",
+        port.get('type', 'N/A'),
+        str(port.get('vlan', 'N/A')),
+        port.get('allowedVlans', 'N/A'),
+        "Yes" if port.get('rstpEnabled') else "No",
+        port.get('stpGuard', 'N/A'),
+        "Yes" if port.get('stormControlEnabled') else "No",
+        f"{float(status.get('usageInKb', {}).get('recv', 'N/A')) / 1000000:.2f}" if status.get('usageInKb', {}).get('recv', 'N/A') != 'N/A' else 'N/A',
+        f"{float(status.get('usageInKb', {}).get('sent', 'N/A')) / 1000000:.2f}" if status.get('usageInKb', {}).get('sent', 'N/A') != 'N/A' else 'N/A',
+        str(status.get('powerUsageInWh', 'N/A')),
+        str(status.get('warnings', 'N/A')),
+        str(status.get('errors', 'N/A'))
+    ]
+
 def display_switch_ports(api_key, serial_number):
     port_statuses = []
     
@@ -66,46 +95,81 @@ def display_switch_ports(api_key, serial_number):
     if switch_ports:
         table = Table(show_header=True, header_style="bold green", box=SIMPLE)
 
-        columns = [
-            ("Port", 5), ("Name", 30), ("Enabled", 5),
-            ("PoE", 5), ("Type", 10), ("VLAN", 5),
-            ("Allowed VLANs", 8), ("RSTP", 5), ("STP Guard", 10),
-            ("Storm Cont", 5), ("In (Gbps)", 8), ("Out (Gbps)", 8),
-            ("powerUsageInWh", 8), ("warnings", 30), ("errors", 30)
-        ]
-        for col_name, col_width in columns:
+        for col_name, col_width in PORT_COLUMNS:
             table.add_column(col_name, style="dim", width=col_width)
 
         for port in switch_ports:
             port_id = port.get('portId', 'N/A')
             status = next((item for item in port_statuses if item.get("portId") == port_id), {})
-
-            row_data = [
-                port.get('portId', 'N/A'),
-                port.get('name', 'N/A'),
-                "Yes" if port.get('enabled') else "No",
-                "Yes" if port.get('poeEnabled') else "No",
-                port.get('type', 'N/A'),
-                str(port.get('vlan', 'N/A')),
-                port.get('allowedVlans', 'N/A'),
-                "Yes" if port.get('rstpEnabled') else "No",
-                port.get('stpGuard', 'N/A'),
-                "Yes" if port.get('stormControlEnabled') else "No",
-                f"{float(status.get('usageInKb', {}).get('recv', 'N/A')) / 1000000:.2f}" if status.get('usageInKb', {}).get('recv', 'N/A') != 'N/A' else 'N/A',
-                f"{float(status.get('usageInKb', {}).get('sent', 'N/A')) / 1000000:.2f}" if status.get('usageInKb', {}).get('sent', 'N/A') != 'N/A' else 'N/A',
-                str(status.get('powerUsageInWh', 'N/A')),
-                str(status.get('warnings', 'N/A')),
-                str(status.get('errors', 'N/A'))
-            ]
-            table.add_row(*row_data)
+            table.add_row(*port_row(port, status))
 
         console = Console()
         console.print("\nSwitch Ports:")
-        console.print(table)
+        with tracing.span("render table", "render"):
+            console.print(table)
     else:
         print("[red]No ports found for the given serial number or failed to fetch ports.[/red]")
 
-    input("Press Enter to continue...")
+    tracing.prompt("Press Enter to continue...")
+
+
+# ==================================================
+# COLLECT the Switch Ports of every Switch in a Network
+# ==================================================
+PORT_WORKERS = 10
+
+def fetch_network_switch_ports(api_key, network_id):
+    # (switch, ports or None, statuses by port ID) for every switch, None if the switches cannot be listed
+    switches = meraki_api.get_meraki_switches(api_key, network_id)
+    if switches is None:
+        return None
+
+    # Configurations and statuses of every switch are fetched in parallel
+    with ThreadPoolExecutor(max_workers=PORT_WORKERS) as executor:
+        jobs = [
+            (switch,
+             executor.submit(meraki_api.get_switch_ports, api_key, switch['serial']),
+             executor.submit(meraki_api.get_switch_ports_statuses_with_timespan, api_key, switch['serial']))
+            for switch in switches
+        ]
+        return [(switch, ports_job.result(), {status.get('portId'): status for status in statuses_job.result() or []}) for switch, ports_job, statuses_job in jobs]
+
+def get_network_switch_ports(api_key, network_id):
+    port_rows = []
+    for switch, ports, statuses in fetch_network_switch_ports(api_key, network_id) or []:
+        for port in ports or []:
+            row = [switch.get('name') or switch['serial'], switch['serial']] + port_row(port, statuses.get(port.get('portId'), {}))
+            port_rows.append(row)
+    return port_rows
+
+def display_network_switch_ports(api_key, network_id, network_name, base_folder_path):
+    term_extra.clear_screen()
+    term_extra.print_ascii_art()
+    print(f"Fetching switch ports for every switch in {network_name}...")
+    port_rows = get_network_switch_ports(api_key, network_id)
+
+    if port_rows:
+        columns = [("Switch", 20), ("Serial", 14)] + PORT_COLUMNS
+        table = Table(show_header=True, header_style="bold green", box=SIMPLE)
+        for col_name, col_width in columns:
+            table.add_column(col_name, style="dim", width=col_width)
+        for row in port_rows:
+            table.add_row(*row)
+
+        console = Console()
+        console.print(f"\nSwitch Ports of {network_name}:")
+        with tracing.span("render table", "render"):
+            console.print(table)
+
+        export = tracing.prompt(colored("\nDo you want to export the table to CSV? [yes/no]: ", "cyan")).lower()
+        if export == 'yes':
+            column_names = [col_name for col_name, _ in columns]
+            with tracing.span("Export Switch Ports CSV", rows=len(port_rows)):
+                meraki_api.export_switch_ports_to_csv([dict(zip(column_names, row)) for row in port_rows], network_name, base_folder_path)
+    else:
+        print(colored("No switch ports found in the selected network.", "red"))
+
+    tracing.prompt(colored("\nPress Enter to return to the precedent menu...", "green"))
 
 
 # ==================================================
@@ -140,26 +204,23 @@ def display_devices(api_key, network_id, device_type):
             table.add_row(*row_data)
 
         console = Console()
-        console.print(table)
+        with tracing.span("render table", "render"):
+            console.print(table)
     else:
         print(colored(f"No {device_type} found in the selected network.", "red"))
 
-    choice = input(colored("\nPress Enter to return to the precedent menu...", "green"))
+    choice = tracing.prompt(colored("\nPress Enter to return to the precedent menu...", "green"))
 
 
 # ==================================================
 # DISPLAY organization devices statuses in table
 # ==================================================
 def display_organization_devices_statuses(api_key, organization_id, network_id):
-    devices_statuses = meraki_api.get_organization_devices_statuses(api_key, organization_id)
+    devices_statuses = meraki_api.get_organization_devices_statuses(api_key, organization_id, network_ids=[network_id], product_types=meraki_api.NETWORK_STATUS_PRODUCT_TYPES)
     term_extra.clear_screen()
     term_extra.print_ascii_art()
 
-    filtered_devices_statuses = [device for device in devices_statuses if device.get('networkId') == network_id]
-    filtered_devices_statuses = [device for device in filtered_devices_statuses if device.get('productType') in ["switch", "wireless"]]
-
     if devices_statuses:
-        devices_statuses = [device for device in devices_statuses if device.get('productType') in ["switch", "wireless"]]
         devices_statuses = sorted(devices_statuses, key=lambda x: x.get('name', '').lower())
         table = Table(show_header=True, header_style="bold green", box=SIMPLE)
 
@@ -198,11 +259,12 @@ def display_organization_devices_statuses(api_key, organization_id, network_id):
             table.add_row(*row_data)
 
         console = Console()
-        console.print(table)
+        with tracing.span("render table", "render"):
+            console.print(table)
 
     else:
         print("[red]No 'switch' devices found in the selected network.[/red]")
-    choice = input("\nPress Enter to return to the previous menu... ")
+    choice = tracing.prompt("\nPress Enter to return to the previous menu... ")
 
 
 # ==================================================
@@ -34,11 +34,11 @@
 # IMPORT various libraries and modules
 # ==================================================
 import ipinfo
-from settings import db_creator
 from rich.console import Console
 from rich.table import Table
 from rich.box import SIMPLE
 from settings import term_extra
+from utilities import tracing
 
 def get_ip_details(ip_address, handler):
     def safe_get_attr(object, attr, subattr=None, default='N/A'):
@@ -97,11 +97,11 @@ def get_ip_details(ip_address, handler):
     except Exception as e:
         return [['Error', str(e)]]
 
-def main(db_password):
+def main(vault):
     term_extra.clear_screen()
     term_extra.print_ascii_art()
-    # Retrieve the IPinfo access token from the database
-    access_token = db_creator.get_tools_ipinfo_access_token(db_password)
+    # The IPinfo access token was read from the database when it was unlocked
+    access_token = vault.ipinfo_token
     if not access_token:
         print("IPinfo access token not found. Please ensure it is set correctly.")
         return  # Exit if no token is found
@@ -109,10 +109,11 @@ def main(db_password):
     handler = ipinfo.getHandler(access_token)
 
     # Ask for the IP address from the user
-    ip_address = input("Please enter an IP address: ")
+    ip_address = tracing.prompt("Please enter an IP address: ")
 
     # Get IP details
-    ip_details = get_ip_details(ip_address, handler)
+    with tracing.span("IPinfo lookup", "http"):
+        ip_details = get_ip_details(ip_address, handler)
     console = Console()
     
     table = Table(show_header=False, header_style="bold green", box=SIMPLE)
@@ -122,9 +123,10 @@ def main(db_password):
     for detail in ip_details:
         table.add_row(*detail)
 
-    console.print(table)
+    with tracing.span("render table", "render"):
+        console.print(table)
     
-    input("Press Enter to continue...")
+    tracing.prompt("Press Enter to continue...")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
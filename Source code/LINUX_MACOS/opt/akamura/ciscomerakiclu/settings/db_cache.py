@@ -0,0 +1,130 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import os
+import json
+import time
+import threading
+from termcolor import colored
+from pysqlcipher3 import dbapi2 as sqlite
+from settings import db_key
+
+
+# ==================================================
+# OPEN the encrypted API response cache
+# ==================================================
+CACHE_DB_PATH = '/opt/akamura/ciscomerakiclu/db/cisco_meraki_clu_cache.db'
+
+class ResponseStore:
+    """
+    SQLCipher database next to cisco_meraki_clu_db.db that keeps the last known
+    body of API responses, keyed by endpoint and parameters, together with the
+    time they were fetched and their ETag.
+    """
+    def __init__(self, password, db_path=CACHE_DB_PATH):
+        if not os.path.exists(os.path.dirname(db_path)):
+            os.makedirs(os.path.dirname(db_path))
+
+        # Background revalidation writes from other threads, the lock serializes them
+        self._lock = threading.Lock()
+        self.conn = sqlite.connect(db_path, check_same_thread=False)
+        db_key.apply_key(self.conn, password)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS api_responses (
+                cache_key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                params TEXT,
+                body TEXT,
+                etag TEXT,
+                fetched_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def cache_key(account, endpoint, params):
+        return f"{account}:{endpoint}:{json.dumps(params, sort_keys=True)}"
+
+    def get(self, account, endpoint, params):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body, etag, fetched_at FROM api_responses WHERE cache_key = ?",
+                (self.cache_key(account, endpoint, params),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"body": json.loads(row[0]), "etag": row[1], "fetched_at": row[2]}
+
+    def find(self, account, endpoint):
+        # Every entry of 'endpoint' for this account, as (params, entry) pairs
+        prefix = f"{account}:{endpoint}:"
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT params, body, etag, fetched_at FROM api_responses WHERE endpoint = ? AND substr(cache_key, 1, ?) = ?",
+                (endpoint, len(prefix), prefix)
+            ).fetchall()
+        entries = []
+        for row in rows:
+            body = json.loads(row[1])
+            entries.append((json.loads(row[0]), {"body": body, "etag": row[2], "fetched_at": row[3]}))
+        return entries
+
+    def put(self, account, endpoint, params, body, etag=None):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO api_responses (cache_key, endpoint, params, body, etag, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.cache_key(account, endpoint, params), endpoint, json.dumps(params, sort_keys=True), json.dumps(body), etag, time.time())
+            )
+            self.conn.commit()
+
+    def delete(self, account, endpoint, params):
+        with self._lock:
+            self.conn.execute("DELETE FROM api_responses WHERE cache_key = ?", (self.cache_key(account, endpoint, params),))
+            self.conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM api_responses")
+            self.conn.commit()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+def open_response_store(password):
+    try:
+        return ResponseStore(password)
+    except Exception as e:
+        print(colored(f"Failed to open the API response cache, continuing without it: {e}", "yellow"))
+        return None
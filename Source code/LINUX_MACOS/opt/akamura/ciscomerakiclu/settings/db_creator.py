@@ -36,6 +36,8 @@ import os
 from getpass import getpass
 from termcolor import colored
 from pysqlcipher3 import dbapi2 as sqlite
+from settings import db_key
+from settings import db_cache
 
 # ==================================================
 # CREATE the encrypted Database
@@ -48,8 +50,13 @@ def create_cisco_meraki_clu_db(password):
         if not os.path.exists(os.path.dirname(db_path)):
             os.makedirs(os.path.dirname(db_path))
 
+        # A new database gets its own salt, a cache left by a previous one cannot be read anymore
+        db_key.save_params(db_key.new_params())
+        if os.path.exists(db_cache.CACHE_DB_PATH):
+            os.remove(db_cache.CACHE_DB_PATH)
+
         conn = sqlite.connect(db_path)
-        conn.execute(f"PRAGMA key = '{password}'")
+        db_key.apply_key(conn, password)
         conn.execute("CREATE TABLE IF NOT EXISTS sensitive_data (id INTEGER PRIMARY KEY, data TEXT)")
         print("Database and table created successfully.")
         conn.close()
@@ -67,21 +74,8 @@ def database_exists():
     db_path = '/opt/akamura/ciscomerakiclu/db/cisco_meraki_clu_db.db'
     return os.path.exists(db_path)
 
-def verify_database_password(password):
-    db_path = '/opt/akamura/ciscomerakiclu/db/cisco_meraki_clu_db.db'
-    try:
-        conn = sqlite.connect(db_path)
-        conn.execute(f"PRAGMA key = '{password}'")
-        conn.execute("SELECT count(*) FROM sensitive_data")
-        conn.close()
-        return True
-    except Exception as e:
-        print(colored("\nError: The provided database password is incorrect.\n", "red"))
-        return False
-
-
 # ==================================================
-# CREATE a new Database table for IPinfo token
+# ASK to create the Database
 # ==================================================
 def prompt_create_database():
     create_db = input("The program need a SQLCipher encrypted database to store sensitive data like Cisco Meraki API key.\nDo you want to create the DB? [yes - no]]: ").strip().lower()
@@ -100,42 +94,135 @@ def prompt_create_database():
         input("\nPress Enter to retry")
         return False
 
-def update_database_schema(password):
-    db_path = '/opt/akamura/ciscomerakiclu/db/cisco_meraki_clu_db.db'
+# ==================================================
+# OPEN the encrypted Database once per session
+# ==================================================
+class SessionVault:
+    """
+    Single SQLCipher connection opened after the password prompt, so the key
+    is derived once per session and SQLCipher is given the raw key. Secrets
+    are read once and served from memory, and changes go through the same
+    connection.
+    """
+    def __init__(self, password, db_path='/opt/akamura/ciscomerakiclu/db/cisco_meraki_clu_db.db'):
+        prepare_raw_key(password)
+        self.conn = sqlite.connect(db_path, check_same_thread=False)
+        db_key.apply_key(self.conn, password)
+        # Raises here when the password is wrong
+        self.conn.execute("SELECT count(*) FROM sensitive_data")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS tools_ipinfo (id INTEGER PRIMARY KEY, access_token TEXT)")
+        self.conn.commit()
+
+        row = self.conn.execute("SELECT data FROM sensitive_data WHERE id = 1").fetchone()
+        self.api_key = row[0] if row else None
+        row = self.conn.execute("SELECT access_token FROM tools_ipinfo ORDER BY id LIMIT 1").fetchone()
+        self.ipinfo_token = row[0] if row else None
+
+    def save_api_key(self, api_key):
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO sensitive_data (id, data) VALUES (1, ?)", (api_key,))
+            self.conn.commit()
+            self.api_key = api_key
+            print("API key saved successfully.")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+    def save_ipinfo_token(self, access_token):
+        # The token is read from the first row, so that row is the one replaced
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO tools_ipinfo (id, access_token) VALUES (1, ?)", (access_token,))
+            self.conn.commit()
+            self.ipinfo_token = access_token
+            print("Access token stored successfully.")
+        except Exception as e:
+            print(f"Failed to store access token: {e}")
+
+    def close(self):
+        self.conn.close()
+
+def open_vault(password):
     try:
-        conn = sqlite.connect(db_path)
-        conn.execute(f"PRAGMA key = '{password}'")
-        conn.execute("CREATE TABLE IF NOT EXISTS tools_ipinfo (id INTEGER PRIMARY KEY, access_token TEXT)")
+        return SessionVault(password)
+    except Exception:
+        print(colored("\nError: The provided database password is incorrect.\n", "red"))
+        return None
+
+
+# ==================================================
+# MOVE the databases to a raw key derived by the CLU
+# ==================================================
+DB_PATH = '/opt/akamura/ciscomerakiclu/db/cisco_meraki_clu_db.db'
+PENDING_PARAMS_PATH = db_key.KDF_PARAMS_PATH + ".pending"
+
+def opens_with(pragma):
+    conn = sqlite.connect(DB_PATH)
+    try:
+        conn.execute(pragma)
+        conn.execute("SELECT count(*) FROM sensitive_data")
+        return True
+    except Exception:
+        return False
+    finally:
         conn.close()
-        print("Database schema updated successfully.")
-    except Exception as e:
-        print(f"Failed to update database schema: {e}")
 
-def store_tools_ipinfo_access_token(password, access_token):
-    db_path = '/opt/akamura/ciscomerakiclu/db/cisco_meraki_clu_db.db'
+def rekey_response_cache(password, raw_key):
+    if not os.path.exists(db_cache.CACHE_DB_PATH):
+        return
+    conn = sqlite.connect(db_cache.CACHE_DB_PATH)
     try:
-        conn = sqlite.connect(db_path)
-        conn.execute(f"PRAGMA key = '{password}'")
-        conn.execute("INSERT INTO tools_ipinfo (access_token) VALUES (?)", (access_token,))
-        conn.commit()
+        db_key.apply_key(conn, password)
+        conn.execute("SELECT count(*) FROM sqlite_master")
+        db_key.rekey(conn, raw_key)
         conn.close()
-        print("Access token stored successfully.")
-    except Exception as e:
-        print(f"Failed to store access token: {e}")
+    except Exception:
+        # Only API responses live there, they are downloaded again
+        conn.close()
+        os.remove(db_cache.CACHE_DB_PATH)
 
-def get_tools_ipinfo_access_token(password):
-    db_path = '/opt/akamura/ciscomerakiclu/db/cisco_meraki_clu_db.db'
+def rekey_databases(password, params):
+    """
+    Re-encrypt the database and the response cache with the raw key derived
+    from 'params'. The parameters are saved as pending first, so a rekey
+    interrupted halfway is sorted out by prepare_raw_key on the next start.
+    """
+    conn = sqlite.connect(DB_PATH)
     try:
-        conn = sqlite.connect(db_path)
-        conn.execute(f"PRAGMA key = '{password}'")
-        cursor = conn.cursor()
-        cursor.execute("SELECT access_token FROM tools_ipinfo LIMIT 1")
-        row = cursor.fetchone()
+        db_key.apply_key(conn, password)
+        # Raises here when the password is wrong, before anything is changed
+        conn.execute("SELECT count(*) FROM sensitive_data")
+
+        raw_key = db_key.derive_raw_key(password, params)
+        db_key.save_params(params, PENDING_PARAMS_PATH)
+        rekey_response_cache(password, raw_key)
+        db_key.rekey(conn, raw_key)
+    finally:
         conn.close()
-        if row:
-            return row[0]
+    os.replace(PENDING_PARAMS_PATH, db_key.KDF_PARAMS_PATH)
+
+def prepare_raw_key(password):
+    # Finish or roll back an interrupted rekey, then move a password keyed database to a raw key
+    pending = db_key.load_params(PENDING_PARAMS_PATH)
+    if pending is not None:
+        if opens_with(db_key.raw_key_pragma("key", db_key.derive_raw_key(password, pending))):
+            os.replace(PENDING_PARAMS_PATH, db_key.KDF_PARAMS_PATH)
         else:
-            return None
+            current = db_key.load_params()
+            old_pragma = db_key.password_pragma("key", password) if current is None else db_key.raw_key_pragma("key", db_key.derive_raw_key(password, current))
+            if not opens_with(old_pragma):
+                raise ValueError("Incorrect database password.")
+            os.remove(PENDING_PARAMS_PATH)
+            # The cache is rekeyed first and may already use the abandoned key
+            if os.path.exists(db_cache.CACHE_DB_PATH):
+                os.remove(db_cache.CACHE_DB_PATH)
+
+    if db_key.load_params() is None and os.path.exists(DB_PATH):
+        rekey_databases(password, db_key.new_params())
+
+def change_key_cost(password, iterations):
+    try:
+        prepare_raw_key(password)
+        rekey_databases(password, db_key.new_params(iterations))
+        return True
     except Exception as e:
-        print(f"Failed to retrieve access token: {e}")
-        return None
\ No newline at end of file
+        print(colored(f"\nFailed to re-encrypt the databases: {e}\n", "red"))
+        return False
@@ -0,0 +1,169 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from getpass import getpass
+from termcolor import colored
+
+
+# ==================================================
+# DERIVE the raw SQLCipher key from the password
+# ==================================================
+DB_DIRECTORY = '/opt/akamura/ciscomerakiclu/db'
+# Salt and cost of the key derivation, not secret, next to the databases
+KDF_PARAMS_PATH = os.path.join(DB_DIRECTORY, 'cisco_meraki_clu_db.kdf.json')
+KDF_ALGORITHM = "sha512"
+# Same cost as a SQLCipher 4 passphrase, override it with CISCOMERAKICLU_KDF_ITERATIONS
+KDF_ITERATIONS = 256000
+KDF_ITERATIONS_ENV = "CISCOMERAKICLU_KDF_ITERATIONS"
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Raw keys already derived by this process, never written anywhere
+_derived = {}
+_derived_lock = threading.Lock()
+
+def configured_iterations():
+    return int(os.environ.get(KDF_ITERATIONS_ENV, KDF_ITERATIONS))
+
+def new_params(iterations=None):
+    return {"algorithm": KDF_ALGORITHM, "iterations": iterations or configured_iterations(), "salt": os.urandom(SALT_BYTES).hex()}
+
+def load_params(path=None):
+    # None means the databases are still keyed with the password itself
+    path = path or KDF_PARAMS_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+def save_params(params, path=None):
+    path = path or KDF_PARAMS_PATH
+    with open(path + ".tmp", "w") as file:
+        json.dump(params, file)
+    os.replace(path + ".tmp", path)
+
+def derive_raw_key(password, params):
+    """
+    PBKDF2 stretches the password once per process and per parameters,
+    later calls with the same password get the key from memory.
+    """
+    cache_key = (hashlib.sha256(password.encode("utf-8")).digest(), params["algorithm"], params["iterations"], params["salt"])
+    with _derived_lock:
+        if cache_key not in _derived:
+            _derived[cache_key] = hashlib.pbkdf2_hmac(params["algorithm"], password.encode("utf-8"), bytes.fromhex(params["salt"]), params["iterations"], KEY_BYTES)
+        return _derived[cache_key]
+
+
+# ==================================================
+# KEY SQLCipher connections
+# ==================================================
+def raw_key_pragma(statement, raw_key):
+    # The hex blob form makes SQLCipher use the key as is, without its own KDF
+    return f"PRAGMA {statement} = \"x'{raw_key.hex()}'\""
+
+def password_pragma(statement, password):
+    # Only for databases created before raw keys, quotes are escaped for SQL
+    escaped = password.replace("'", "''")
+    return f"PRAGMA {statement} = '{escaped}'"
+
+def apply_key(conn, password, params_path=None):
+    params = load_params(params_path)
+    if params is None:
+        conn.execute(password_pragma("key", password))
+    else:
+        conn.execute(raw_key_pragma("key", derive_raw_key(password, params)))
+
+def rekey(conn, raw_key):
+    conn.execute(raw_key_pragma("rekey", raw_key))
+
+
+# ==================================================
+# BENCHMARK the cost of the key derivation
+# ==================================================
+BENCHMARK_ITERATIONS = (64000, 256000, 600000, 1000000)
+
+def benchmark(iterations_list=BENCHMARK_ITERATIONS, rounds=3):
+    # Best of 'rounds' derivations, in seconds, for each iteration count
+    results = []
+    salt = os.urandom(SALT_BYTES)
+    for iterations in iterations_list:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            hashlib.pbkdf2_hmac(KDF_ALGORITHM, b"benchmark password", salt, iterations, KEY_BYTES)
+            timings.append(time.perf_counter() - started)
+        results.append((iterations, min(timings)))
+    return results
+
+
+# ==================================================
+# RUN the benchmark or change the cost from the command line
+# ==================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Key derivation of the Cisco Meraki CLU databases.")
+    parser.add_argument("--benchmark", action="store_true", help="time one derivation for several iteration counts")
+    parser.add_argument("--iterations", type=int, action="append", help="iteration count to benchmark, or the new cost with --rekey")
+    parser.add_argument("--rekey", action="store_true", help="derive a new key with a new salt and --iterations, and re-encrypt the databases with it")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        current = load_params()
+        print(f"PBKDF2-HMAC-{KDF_ALGORITHM.upper()}, {KEY_BYTES}-byte key. Paid once per process, not on every database access.")
+        for iterations, seconds in benchmark(args.iterations or BENCHMARK_ITERATIONS):
+            marker = "  <- current" if current and current["iterations"] == iterations else ""
+            print(f"  {iterations:>9,} iterations  {seconds * 1000:8.1f} ms{marker}")
+        return 0
+
+    if args.rekey:
+        from settings import db_creator
+        password = getpass("Database password: ")
+        if db_creator.change_key_cost(password, args.iterations[-1] if args.iterations else configured_iterations()):
+            print(colored("Databases re-encrypted with the new key.", "green"))
+            return 0
+        return 1
+
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import os
+import re
+import sys
+import types
+import sqlite3
+import importlib.util
+import pytest
+
+# The tests import the program modules the way main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# ==================================================
+# STAND IN for SQLCipher when pysqlcipher3 is missing
+# ==================================================
+# Key each database file was last keyed or rekeyed with
+database_keys = {}
+
+class KeyedConnection(sqlite3.Connection):
+    """
+    Plain sqlite3 connection that keeps PRAGMA key / rekey as bookkeeping:
+    nothing is encrypted, but a connection keyed differently from its file
+    fails like SQLCipher does, so key handling can be tested.
+    """
+    def __init__(self, path, *args, **kwargs):
+        super().__init__(path, *args, **kwargs)
+        self.path = os.path.abspath(path)
+        self.key = None
+
+    def execute(self, sql, *args):
+        pragma = re.match(r"\s*PRAGMA (key|rekey) = (.*)$", sql, re.I | re.S)
+        if pragma and pragma.group(1).lower() == "key":
+            self.key = pragma.group(2)
+            return super().execute("SELECT 1")
+        self.check_key()
+        if pragma:
+            self.key = database_keys[self.path] = pragma.group(2)
+            return super().execute("SELECT 1")
+        return super().execute(sql, *args)
+
+    def check_key(self):
+        # A new or emptied file takes the key it is first used with
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            database_keys[self.path] = self.key
+        elif database_keys[self.path] != self.key:
+            raise sqlite3.DatabaseError("file is not a database")
+
+if importlib.util.find_spec("pysqlcipher3") is None:
+    dbapi2 = types.ModuleType("pysqlcipher3.dbapi2")
+    dbapi2.connect = lambda path, **kwargs: sqlite3.connect(path, factory=KeyedConnection, **kwargs)
+    dbapi2.DatabaseError = sqlite3.DatabaseError
+    sys.modules["pysqlcipher3"] = types.ModuleType("pysqlcipher3")
+    sys.modules["pysqlcipher3"].dbapi2 = dbapi2
+    sys.modules["pysqlcipher3.dbapi2"] = dbapi2
+
+from modules.meraki import meraki_api
+from modules.meraki import meraki_mock_server
+
+
+# ==================================================
+# SERVE a mock Dashboard for each test
+# ==================================================
+@pytest.fixture
+def dashboard(monkeypatch):
+    """
+    Mock Dashboard API with two small Organizations, served on a free port
+    without throttling. The module level state of meraki_api is reset around
+    each test.
+    """
+    dashboard = meraki_mock_server.MockDashboard(organizations=2, networks=5)
+    settings = meraki_mock_server.MockSettings()
+    settings.rate_limit = 10000
+    server = meraki_mock_server.serve(port=0, dashboard=dashboard, settings=settings)
+    monkeypatch.setattr(meraki_api.client, "base_url", f"http://127.0.0.1:{server.server_address[1]}/api/v1")
+    monkeypatch.setattr(meraki_api.rate_limiter, "rate", 1000)
+    monkeypatch.setattr(meraki_api.rate_limiter, "burst", 1000)
+    reset_meraki_api()
+    yield dashboard
+    reset_meraki_api()
+    server.shutdown()
+
+def reset_meraki_api():
+    meraki_api.cache.invalidate()
+    meraki_api.network_device_index.clear()
+    meraki_api.attach_response_store(None)
+    meraki_api.attach_mirror(None)
+
+
+# ==================================================
+# MOVE the databases into a temporary folder
+# ==================================================
+@pytest.fixture
+def db_paths(tmp_path, monkeypatch):
+    from settings import db_key, db_cache, db_creator
+    paths = types.SimpleNamespace(
+        db=str(tmp_path / "cisco_meraki_clu_db.db"),
+        cache=str(tmp_path / "cisco_meraki_clu_cache.db"),
+        params=str(tmp_path / "cisco_meraki_clu_db.kdf.json")
+    )
+    paths.pending = paths.params + ".pending"
+    monkeypatch.setattr(db_key, "KDF_PARAMS_PATH", paths.params)
+    monkeypatch.setattr(db_key, "KDF_ITERATIONS", 1000)
+    monkeypatch.setattr(db_cache, "CACHE_DB_PATH", paths.cache)
+    monkeypatch.setattr(db_creator, "DB_PATH", paths.db)
+    monkeypatch.setattr(db_creator, "PENDING_PARAMS_PATH", paths.pending)
+    return paths
@@ -29,46 +29,57 @@
 #**************************************************************************
 
 
+
 # ==================================================
 # IMPORT various libraries and modules
 # ==================================================
-import os
-from pysqlcipher3 import dbapi2 as sqlite
-from termcolor import colored
+import pytest
+from modules.meraki import meraki_api
+from modules.meraki import meraki_action_batches
 
 
 # ==================================================
-# SAVE the Cisco Meraki API Key in the Encrypted DB
+# TEST chunking, the pending limit and busy retries
 # ==================================================
-def save_api_key(db_password, api_key):
-    try:
-        db_path = os.path.join('/opt/akamura/ciscomerakiclu/db', 'cisco_meraki_clu_db.db')
-        conn = sqlite.connect(db_path)
-        conn.execute(f"PRAGMA key = '{db_password}'")
-        conn.execute("INSERT OR REPLACE INTO sensitive_data (id, data) VALUES (1, ?)", (api_key,))
-        conn.commit()
-        print("API key saved successfully.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
-    finally:
-        conn.close()
-
-def get_api_key(db_password):
-    conn = None  # Initialize connection to None
-    try:
-        db_path = os.path.join('/opt/akamura/ciscomerakiclu/db', 'cisco_meraki_clu_db.db')
-        conn = sqlite.connect(db_path)
-        conn.execute(f"PRAGMA key = '{db_password}'")
-
-        cursor = conn.execute("SELECT data FROM sensitive_data WHERE id = 1")
-        api_key = cursor.fetchone()
-
-        return api_key[0] if api_key else None
-
-    except Exception as e:
-        print(colored("An error occurred while accessing the database: ", "red") + str(e))
-        return None
-
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
+ORGANIZATION_ID = "100000"
+
+@pytest.fixture
+def actions(dashboard, monkeypatch):
+    # Mock batches complete one second after they are submitted
+    monkeypatch.setattr(meraki_action_batches, "POLL_INTERVAL", 0.2)
+    switch = next(device for device in meraki_api.iter_organization_devices("k", ORGANIZATION_ID) if device['model'].startswith("MS"))
+    return [meraki_action_batches.rename_switch_port_action(switch['serial'], port % 48 + 1, f"desk-{port}") for port in range(250)]
+
+def fill_organization(actions):
+    for _ in range(meraki_action_batches.MAX_PENDING_BATCHES):
+        assert meraki_action_batches.submit_action_batch("k", ORGANIZATION_ID, actions[:1]) not in (None, meraki_action_batches.ORGANIZATION_BUSY)
+
+def test_actions_are_sent_in_batches_of_100(dashboard, actions):
+    results = meraki_action_batches.run_action_batches("k", ORGANIZATION_ID, actions)
+
+    assert [len(batch["actions"]) for batch in dashboard.action_batches.values()] == [100, 100, 50]
+    assert [result["action"] for result in results] == actions
+    assert {result["status"] for result in results} == {"completed"}
+    assert [result["batch_id"] for result in results] == ["1"] * 100 + ["2"] * 100 + ["3"] * 50
+
+def test_sixth_pending_batch_is_refused(dashboard, actions):
+    fill_organization(actions)
+
+    assert meraki_action_batches.submit_action_batch("k", ORGANIZATION_ID, actions[:1]) is meraki_action_batches.ORGANIZATION_BUSY
+    assert len(dashboard.action_batches) == meraki_action_batches.MAX_PENDING_BATCHES
+
+def test_busy_organization_is_retried(dashboard, actions):
+    fill_organization(actions)
+
+    results = meraki_action_batches.run_action_batches("k", ORGANIZATION_ID, actions[:150])
+
+    assert {result["status"] for result in results} == {"completed"}
+    assert [len(batch["actions"]) for batch in dashboard.action_batches.values()][5:] == [100, 50]
+
+def test_pending_batches_time_out(dashboard, actions):
+    fill_organization(actions)
+
+    results = meraki_action_batches.run_action_batches("k", ORGANIZATION_ID, actions[:150], timeout=0.5)
+
+    assert {result["status"] for result in results} == {"timed out"}
+    assert {result["batch_id"] for result in results} == {None}
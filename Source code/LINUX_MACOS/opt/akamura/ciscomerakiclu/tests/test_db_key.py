@@ -0,0 +1,162 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import os
+import pytest
+from pysqlcipher3 import dbapi2 as sqlite
+from settings import db_key
+from settings import db_cache
+from settings import db_creator
+
+
+# ==================================================
+# TEST the move to a raw key and interrupted rekeys
+# ==================================================
+PASSWORD = "correct horse"
+API_KEY = "0123456789abcdef"
+
+def create_legacy_databases(paths):
+    # Both databases keyed with the password itself, as before raw keys
+    conn = sqlite.connect(paths.db)
+    conn.execute(db_key.password_pragma("key", PASSWORD))
+    conn.execute("CREATE TABLE sensitive_data (id INTEGER PRIMARY KEY, data TEXT)")
+    conn.execute("INSERT INTO sensitive_data (id, data) VALUES (1, ?)", (API_KEY,))
+    conn.commit()
+    conn.close()
+    store = db_cache.ResponseStore(PASSWORD, db_path=paths.cache)
+    store.put("k", "/organizations", {}, [{"id": "1"}])
+    store.conn.close()
+
+def read_api_key(path, password=PASSWORD):
+    conn = sqlite.connect(path)
+    try:
+        db_key.apply_key(conn, password)
+        return conn.execute("SELECT data FROM sensitive_data WHERE id = 1").fetchone()[0]
+    finally:
+        conn.close()
+
+def cache_opens(path):
+    conn = sqlite.connect(path)
+    try:
+        db_key.apply_key(conn, PASSWORD)
+        conn.execute("SELECT count(*) FROM api_responses")
+        return True
+    except sqlite.DatabaseError:
+        return False
+    finally:
+        conn.close()
+
+def fail_database_rekey(monkeypatch):
+    # The cache is rekeyed first, the second rekey is the database
+    rekey = db_key.rekey
+    calls = []
+    def interrupted(conn, raw_key):
+        calls.append(conn)
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        rekey(conn, raw_key)
+    monkeypatch.setattr(db_key, "rekey", interrupted)
+
+def test_legacy_databases_move_to_a_raw_key(db_paths):
+    create_legacy_databases(db_paths)
+    db_creator.prepare_raw_key(PASSWORD)
+
+    assert db_key.load_params()["iterations"] == 1000
+    assert not os.path.exists(db_paths.pending)
+    assert read_api_key(db_paths.db) == API_KEY
+    assert cache_opens(db_paths.cache)
+
+def test_rekey_interrupted_before_the_database_is_rolled_back(db_paths, monkeypatch):
+    create_legacy_databases(db_paths)
+    db_creator.prepare_raw_key(PASSWORD)
+    current = db_key.load_params()
+    with monkeypatch.context() as patch:
+        fail_database_rekey(patch)
+        assert not db_creator.change_key_cost(PASSWORD, 2000)
+    # The cache already moved to the pending key, the database did not
+    assert os.path.exists(db_paths.pending)
+    assert not cache_opens(db_paths.cache)
+
+    db_creator.prepare_raw_key(PASSWORD)
+    assert db_key.load_params() == current
+    assert not os.path.exists(db_paths.pending)
+    assert not os.path.exists(db_paths.cache)
+    assert read_api_key(db_paths.db) == API_KEY
+
+    store = db_cache.ResponseStore(PASSWORD, db_path=db_paths.cache)
+    store.put("k", "/organizations", {}, [{"id": "1"}])
+    store.conn.close()
+    assert cache_opens(db_paths.cache)
+
+def test_rekey_interrupted_after_the_database_is_finished(db_paths, monkeypatch):
+    create_legacy_databases(db_paths)
+    replace = os.replace
+    def interrupted(source, destination):
+        if source == db_paths.pending:
+            raise OSError("interrupted")
+        replace(source, destination)
+    with monkeypatch.context() as patch:
+        patch.setattr(db_creator.os, "replace", interrupted)
+        with pytest.raises(OSError):
+            db_creator.prepare_raw_key(PASSWORD)
+    assert os.path.exists(db_paths.pending)
+
+    db_creator.prepare_raw_key(PASSWORD)
+    assert not os.path.exists(db_paths.pending)
+    assert read_api_key(db_paths.db) == API_KEY
+    assert cache_opens(db_paths.cache)
+
+def test_wrong_password_keeps_the_pending_rekey(db_paths, monkeypatch):
+    create_legacy_databases(db_paths)
+    with monkeypatch.context() as patch:
+        fail_database_rekey(patch)
+        with pytest.raises(RuntimeError):
+            db_creator.prepare_raw_key(PASSWORD)
+
+    with pytest.raises(ValueError):
+        db_creator.prepare_raw_key("wrong password")
+    assert os.path.exists(db_paths.pending)
+    assert os.path.exists(db_paths.cache)
+
+def test_change_key_cost_rekeys_both_databases(db_paths):
+    create_legacy_databases(db_paths)
+    assert db_creator.change_key_cost(PASSWORD, 2000)
+
+    assert db_key.load_params()["iterations"] == 2000
+    assert read_api_key(db_paths.db) == API_KEY
+    assert cache_opens(db_paths.cache)
+    with pytest.raises(sqlite.DatabaseError):
+        read_api_key(db_paths.db, "wrong password")
@@ -0,0 +1,141 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import pytest
+from modules.meraki import meraki_api
+from modules.meraki import meraki_mirror
+from settings import db_cache
+
+
+# ==================================================
+# TEST syncing and reading the Organization mirror
+# ==================================================
+API_KEY = "test"
+ORGANIZATION_ID = "100000"
+
+@pytest.fixture
+def mirror(dashboard, db_paths):
+    store = db_cache.ResponseStore("password", db_path=db_paths.cache)
+    organization_mirror = meraki_mirror.OrganizationMirror(store)
+    meraki_api.attach_mirror(organization_mirror)
+    yield organization_mirror
+    store.conn.close()
+
+def statuses_by_serial(mirror):
+    return {status["serial"]: status["status"] for status in mirror.lookup(API_KEY, "statuses", ORGANIZATION_ID)}
+
+def test_first_sync_is_full_and_later_ones_incremental(mirror):
+    full = mirror.sync(API_KEY, ORGANIZATION_ID)
+    assert (full["mode"], full["networks"], full["devices"]) == ("full", 5, 55)
+
+    incremental = mirror.sync(API_KEY, ORGANIZATION_ID)
+    assert (incremental["mode"], incremental["devices"], incremental["changed_networks"]) == ("incremental", 55, 0)
+    # Only the change log and the availability history
+    assert incremental["requests"] == 2
+
+    assert mirror.sync(API_KEY, ORGANIZATION_ID, full=True)["mode"] == "full"
+
+def test_changed_network_drops_its_ports_and_rules(dashboard, mirror):
+    mirror.sync(API_KEY, ORGANIZATION_ID)
+    switch = dashboard.device(0, 1, 1)["serial"]
+    other_switch = dashboard.device(0, 2, 1)["serial"]
+    for serial in (switch, other_switch):
+        meraki_api.get_switch_ports(API_KEY, serial)
+    for network_id in ("L_0_1", "L_0_2"):
+        meraki_api.get_l3_firewall_rules(API_KEY, network_id)
+    assert mirror.lookup(API_KEY, "switch_ports", switch) is not meraki_api.MISSING
+    assert mirror.lookup(API_KEY, "l3_rules", "L_0_1") is not meraki_api.MISSING
+
+    dashboard.record_configuration_change(0, "L_0_1", "switch/ports", "update")
+    result = mirror.sync(API_KEY, ORGANIZATION_ID)
+    assert (result["mode"], result["changed_networks"], result["devices"]) == ("incremental", 1, 55)
+
+    assert mirror.lookup(API_KEY, "switch_ports", switch) is meraki_api.MISSING
+    assert mirror.lookup(API_KEY, "l3_rules", "L_0_1") is meraki_api.MISSING
+    assert mirror.lookup(API_KEY, "switch_ports", other_switch) is not meraki_api.MISSING
+    assert mirror.lookup(API_KEY, "l3_rules", "L_0_2") is not meraki_api.MISSING
+    # Dropped from the store too, a new mirror does not load them again
+    account = meraki_api.account_of(API_KEY)
+    assert [params["serial"] for params, _ in mirror.store.find(account, meraki_mirror.PORTS_ENDPOINT)] == [other_switch]
+
+def test_full_sync_starts_a_new_generation(dashboard, mirror):
+    mirror.sync(API_KEY, ORGANIZATION_ID)
+    switch = dashboard.device(0, 1, 1)["serial"]
+    meraki_api.get_switch_ports(API_KEY, switch)
+    assert mirror.lookup(API_KEY, "switch_ports", switch) is not meraki_api.MISSING
+
+    mirror.sync(API_KEY, ORGANIZATION_ID, full=True)
+    assert mirror.lookup(API_KEY, "switch_ports", switch) is meraki_api.MISSING
+
+def test_status_flips_without_configuration_change(dashboard, mirror):
+    mirror.sync(API_KEY, ORGANIZATION_ID)
+    serial, status = next(iter(statuses_by_serial(mirror).items()))
+    new_status = "offline" if status != "offline" else "online"
+
+    dashboard.record_availability_change(serial, status, new_status)
+    result = mirror.sync(API_KEY, ORGANIZATION_ID)
+    assert (result["changed_networks"], result["requests"]) == (0, 2)
+    assert statuses_by_serial(mirror)[serial] == new_status
+
+def test_outdated_mirror_is_synced_before_it_is_read(dashboard, mirror):
+    mirror.sync(API_KEY, ORGANIZATION_ID)
+    serial, status = next(iter(statuses_by_serial(mirror).items()))
+    new_status = "offline" if status != "offline" else "online"
+    dashboard.record_availability_change(serial, status, new_status)
+
+    # Still within MIRROR_MAX_AGE, served as mirrored
+    assert statuses_by_serial(mirror)[serial] == status
+
+    document = mirror._documents[(meraki_api.account_of(API_KEY), ORGANIZATION_ID)]
+    document["synced_at"] -= meraki_mirror.MIRROR_MAX_AGE + 1
+    assert statuses_by_serial(mirror)[serial] == new_status
+
+def test_changed_networks_are_requested_in_chunks(dashboard, mirror, monkeypatch):
+    mirror.sync(API_KEY, ORGANIZATION_ID)
+    for net in range(dashboard.networks):
+        dashboard.record_configuration_change(0, f"L_0_{net}", "switch/ports", "update")
+
+    requested = []
+    iter_organization_devices = meraki_api.iter_organization_devices
+    def recording(api_key, organization_id, **kwargs):
+        requested.append(len(kwargs["network_ids"]))
+        return iter_organization_devices(api_key, organization_id, **kwargs)
+    monkeypatch.setattr(meraki_mirror, "NETWORK_IDS_PER_REQUEST", 2)
+    monkeypatch.setattr(meraki_api, "iter_organization_devices", recording)
+
+    result = mirror.sync(API_KEY, ORGANIZATION_ID)
+    assert (result["changed_networks"], result["devices"]) == (5, 55)
+    assert sorted(requested) == [1, 2, 2]
@@ -0,0 +1,418 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import os
+import sys
+import csv
+import json
+import argparse
+import contextlib
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ==================================================
+# IMPORT custom modules
+# ==================================================
+from modules.meraki import meraki_api
+from modules.meraki import meraki_exporter
+from modules.meraki import meraki_ms_mr
+from modules.meraki import meraki_sweep
+from modules.meraki import meraki_mirror
+from modules.meraki import meraki_action_batches
+
+
+# ==================================================
+# DEFINE the credentials read by headless runs
+# ==================================================
+API_KEY_ENV = "MERAKI_DASHBOARD_API_KEY"
+IPINFO_TOKEN_ENV = "IPINFO_TOKEN"
+DB_PASSWORD_ENV = "CISCOMERAKICLU_DB_PASSWORD"
+
+def read_db_password(arguments):
+    if arguments.db_password_file:
+        with open(arguments.db_password_file) as file:
+            return file.read().strip()
+    return os.environ.get(DB_PASSWORD_ENV, "")
+
+class CommandError(Exception):
+    pass
+
+def listen_address(value):
+    # HOST:PORT or :PORT for the default host, checked by argparse
+    host, _, port = value.rpartition(":")
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT with a port between 1 and 65535, got '{value}'")
+    return host or meraki_exporter.EXPORTER_HOST, int(port)
+
+
+# ==================================================
+# DEFINE the subcommands
+# ==================================================
+def add_subcommands(parser):
+    """
+    Register the batch subcommands on the main parser. Every subcommand runs
+    without prompts or screen redraws and writes its result to stdout, while
+    progress and error messages go to stderr.
+    """
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", choices=["json", "csv"], default="json", help="output format (default: json)")
+
+    organization = argparse.ArgumentParser(add_help=False)
+    organization.add_argument("--org", required=True, help="Organization ID or name")
+
+    network = argparse.ArgumentParser(add_help=False)
+    network.add_argument("--network", help="Network ID or name")
+
+    product_types = argparse.ArgumentParser(add_help=False)
+    product_types.add_argument("--product-type", action="append", help="switch, wireless, appliance... repeat it for more")
+
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.add_parser("orgs", parents=[output], help="list the Organizations")
+    commands.add_parser("networks", parents=[output, organization], help="list the Networks of an Organization")
+    devices = commands.add_parser("devices", parents=[output, organization, network, product_types], help="list the Devices of an Organization or a Network")
+    devices.add_argument("--model", action="append", help="only this model, e.g. MS225-48LP, repeat it for more")
+    devices.add_argument("--tag", action="append", help="only devices with this tag, repeat it for more")
+
+    ports = commands.add_parser("ports", parents=[output], help="list Switch Ports with their status")
+    ports.add_argument("--serial", help="switch serial number")
+    ports.add_argument("--org", help="Organization ID or name, needed to find a Network by name")
+    ports.add_argument("--network", help="every switch of this Network ID or name")
+
+    commands.add_parser("fw-rules", parents=[output, organization, network], help="list the L3 Firewall Rules of a Network")
+    commands.add_parser("statuses", parents=[output, organization, network, product_types], help="list the Devices Statuses of an Organization or a Network")
+
+    export = commands.add_parser("export", parents=[organization], help="write CSV files like the menu downloads do")
+    export.add_argument("--network", required=True, help="Network ID or name")
+    export.add_argument("what", nargs="+", choices=["switches", "access-points", "ports", "fw-rules", "statuses"], help="what to export")
+    export.add_argument("--output-dir", help="folder for the CSV files (default: ~/Downloads/Cisco-Meraki-CLU-Export-<date>)")
+
+    dnsbl = commands.add_parser("dnsbl", parents=[output], help="check an IP address against the DNSBL services")
+    dnsbl.add_argument("ip", help="IP address to check")
+
+    ipcheck = commands.add_parser("ipcheck", parents=[output], help="look up an IP address on IPinfo")
+    ipcheck.add_argument("ip", help="IP address to look up")
+
+    sweep = commands.add_parser("sweep", parents=[output], help="collect networks, devices and statuses of every Organization in parallel")
+    sweep.add_argument("--org", action="append", help="Organization ID or name to sweep, repeat it for more, all of them if omitted")
+    sweep.add_argument("--output-dir", help="folder for the per-Organization files and the summary (default: ~/Downloads/Cisco-Meraki-CLU-Sweep-<time>)")
+    sweep.add_argument("--workers", type=int, default=meraki_sweep.MAX_ORGANIZATION_WORKERS, help="Organizations swept at the same time")
+
+    mirror_sync = commands.add_parser("mirror-sync", parents=[output], help="bring the local mirror of Organizations up to date")
+    mirror_sync.add_argument("--org", action="append", help="Organization ID or name to sync, it is mirrored from now on; every mirrored one if omitted")
+    mirror_sync.add_argument("--full", action="store_true", help="download everything again instead of only what changed")
+
+    rename_ports = commands.add_parser("rename-ports", parents=[output, organization], help="rename switch ports listed in a CSV file through action batches")
+    rename_ports.add_argument("csv", help="CSV file with the columns serial, port_id and name")
+    rename_ports.add_argument("--timeout", metavar="SECONDS", type=int, default=meraki_action_batches.RUN_TIMEOUT, help="give up on batches still pending after this long")
+
+    retag = commands.add_parser("retag", parents=[output, organization], help="replace the tags of devices listed in a CSV file through action batches")
+    retag.add_argument("csv", help="CSV file with the columns serial and tags, tags separated by spaces")
+    retag.add_argument("--timeout", metavar="SECONDS", type=int, default=meraki_action_batches.RUN_TIMEOUT, help="give up on batches still pending after this long")
+
+    exporter = commands.add_parser("exporter", help="serve device and uplink statuses as Prometheus metrics")
+    exporter.add_argument("--listen", metavar="HOST:PORT", type=listen_address, default=f"{meraki_exporter.EXPORTER_HOST}:{meraki_exporter.EXPORTER_PORT}", help="address the metrics are served on")
+    exporter.add_argument("--interval", metavar="SECONDS", type=int, default=meraki_exporter.POLL_INTERVAL, help="seconds between two polls of the Dashboard API")
+    exporter.add_argument("--org", action="append", help="Organization ID or name to poll, repeat it for more, all of them if omitted")
+    return commands
+
+
+# ==================================================
+# RESOLVE Organizations and Networks by ID or name
+# ==================================================
+def resolve_organization(api_key, value):
+    organizations = meraki_api.get_meraki_organizations(api_key)
+    if organizations is None:
+        raise CommandError("Failed to fetch organizations")
+    for organization in organizations:
+        if value in (organization['id'], organization['name']):
+            return organization
+    matches = [organization for organization in organizations if organization['name'].lower() == value.lower()]
+    if len(matches) == 1:
+        return matches[0]
+    raise CommandError(f"Organization '{value}' not found")
+
+def resolve_network(api_key, organization_id, value):
+    try:
+        networks = list(meraki_api.iter_meraki_networks(api_key, organization_id))
+    except meraki_api.MerakiAPIError as e:
+        raise CommandError(f"Failed to fetch networks. Status code: {e.status_code}")
+    for network in networks:
+        if value in (network['id'], network['name']):
+            return network
+    matches = [network for network in networks if network['name'].lower() == value.lower()]
+    if len(matches) == 1:
+        return matches[0]
+    raise CommandError(f"Network '{value}' not found")
+
+
+# ==================================================
+# WRITE the results to stdout
+# ==================================================
+def write_output(rows, output_format, stream):
+    if output_format == "json":
+        json.dump(rows, stream, indent=2)
+        stream.write("\n")
+        return
+
+    # CSV columns are the union of the keys, nested values are written as JSON
+    rows = rows if isinstance(rows, list) else [rows]
+    columns = []
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+    writer = csv.DictWriter(stream, fieldnames=columns)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in row.items()})
+
+
+# ==================================================
+# RUN the subcommands
+# ==================================================
+def switch_ports_with_statuses(api_key, serial, switch_name=None):
+    ports = meraki_api.get_switch_ports(api_key, serial)
+    if ports is None:
+        raise CommandError(f"Failed to fetch switch ports for serial {serial}")
+    statuses = {status.get('portId'): status for status in meraki_api.get_switch_ports_statuses_with_timespan(api_key, serial) or []}
+    return [dict(port, switch=switch_name or serial, serial=serial, status=statuses.get(port.get('portId'), {})) for port in ports]
+
+def command_orgs(api_key, arguments):
+    organizations = meraki_api.get_meraki_organizations(api_key)
+    if organizations is None:
+        raise CommandError("Failed to fetch organizations")
+    return organizations
+
+def command_networks(api_key, arguments):
+    organization = resolve_organization(api_key, arguments.org)
+    try:
+        return list(meraki_api.iter_meraki_networks(api_key, organization['id']))
+    except meraki_api.MerakiAPIError as e:
+        raise CommandError(f"Failed to fetch networks. Status code: {e.status_code}")
+
+def command_devices(api_key, arguments):
+    organization = resolve_organization(api_key, arguments.org)
+    network_ids = [resolve_network(api_key, organization['id'], arguments.network)['id']] if arguments.network else None
+    inventory = meraki_api.get_organization_inventory(api_key, organization['id'], arguments.product_type, network_ids)
+    if inventory is None:
+        raise CommandError("Failed to fetch organization devices")
+    return inventory.select(arguments.model, arguments.tag)
+
+def network_switch_ports(api_key, network_id):
+    switches = meraki_ms_mr.fetch_network_switch_ports(api_key, network_id)
+    if switches is None:
+        raise CommandError(f"Failed to fetch switches for network {network_id}")
+    rows = []
+    for switch, ports, statuses in switches:
+        if ports is None:
+            raise CommandError(f"Failed to fetch switch ports for serial {switch['serial']}")
+        rows.extend(dict(port, switch=switch.get('name') or switch['serial'], serial=switch['serial'], status=statuses.get(port.get('portId'), {})) for port in ports)
+    return rows
+
+def command_ports(api_key, arguments):
+    if arguments.serial:
+        return switch_ports_with_statuses(api_key, arguments.serial)
+    if not arguments.network:
+        raise CommandError("Either --serial or --network is required")
+
+    network_id = arguments.network
+    if arguments.org:
+        network_id = resolve_network(api_key, resolve_organization(api_key, arguments.org)['id'], arguments.network)['id']
+    return network_switch_ports(api_key, network_id)
+
+def command_fw_rules(api_key, arguments):
+    if not arguments.network:
+        raise CommandError("--network is required")
+    organization = resolve_organization(api_key, arguments.org)
+    network = resolve_network(api_key, organization['id'], arguments.network)
+    rules = meraki_api.get_l3_firewall_rules(api_key, network['id'])
+    if rules is None:
+        raise CommandError("Failed to fetch L3 firewall rules")
+    return rules
+
+def command_statuses(api_key, arguments):
+    organization = resolve_organization(api_key, arguments.org)
+    network_ids = [resolve_network(api_key, organization['id'], arguments.network)['id']] if arguments.network else None
+    try:
+        return list(meraki_api.iter_organization_devices_statuses(api_key, organization['id'], network_ids, arguments.product_type))
+    except meraki_api.MerakiAPIError as e:
+        raise CommandError(f"Failed to fetch organization devices statuses. Status code: {e.status_code}")
+
+def command_export(api_key, arguments):
+    organization = resolve_organization(api_key, arguments.org)
+    network = resolve_network(api_key, organization['id'], arguments.network)
+    folder = arguments.output_dir or os.path.join(str(Path.home() / "Downloads"), f"Cisco-Meraki-CLU-Export-{datetime.now().strftime('%Y-%m-%d')}")
+    os.makedirs(folder, exist_ok=True)
+
+    for what in arguments.what:
+        if what == "switches":
+            meraki_api.export_devices_to_csv(meraki_api.get_meraki_switches(api_key, network['id']) or [], network['name'], 'switches', folder)
+        elif what == "access-points":
+            meraki_api.export_devices_to_csv(meraki_api.get_meraki_access_points(api_key, network['id']) or [], network['name'], 'access_points', folder)
+        elif what == "ports":
+            # Same columns as the CSV offered by the menu
+            column_names = ["Switch", "Serial"] + [col_name for col_name, _ in meraki_ms_mr.PORT_COLUMNS]
+            port_rows = meraki_ms_mr.get_network_switch_ports(api_key, network['id'])
+            meraki_api.export_switch_ports_to_csv([dict(zip(column_names, row)) for row in port_rows], network['name'], folder)
+        elif what == "fw-rules":
+            meraki_api.export_firewall_rules_to_csv(meraki_api.get_l3_firewall_rules(api_key, network['id']) or [], network['name'], folder)
+        elif what == "statuses":
+            meraki_api.export_devices_statuses_to_csv(api_key, organization['id'], network['id'], network['name'], folder)
+    return None
+
+def command_dnsbl(arguments):
+    from modules.tools.dnsbl import dnsbl_check
+    services = dnsbl_check.load_services()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = executor.map(lambda item: (item[0], dnsbl_check.lookup_dnsbl(arguments.ip, item[1])), services.items())
+        return [{"service": service, "result": result} for service, result in results]
+
+def command_ipcheck(ipinfo_token, arguments):
+    import ipinfo
+    from modules.tools.utilities import tools_ipcheck
+    details = tools_ipcheck.get_ip_details(arguments.ip, ipinfo.getHandler(ipinfo_token))
+    return [{"name": name, "value": value} for name, value in details]
+
+def command_sweep(api_key, arguments):
+    organizations = [resolve_organization(api_key, value) for value in arguments.org] if arguments.org else None
+    folder = arguments.output_dir or os.path.join(str(Path.home() / "Downloads"), f"Cisco-Meraki-CLU-Sweep-{datetime.now().strftime('%Y-%m-%d_%H-%M')}")
+    summaries = meraki_sweep.sweep_organizations(
+        api_key, folder, organizations, arguments.workers,
+        progress=lambda summary: print(f"{summary['organization_name']}: {summary['devices']} devices in {summary['seconds']}s {summary['error']}")
+    )
+    if summaries is None:
+        raise CommandError("Failed to fetch organizations")
+    print(f"Results written to {folder}")
+    return summaries
+
+def command_mirror_sync(api_key, arguments):
+    if meraki_api.mirror is None:
+        raise CommandError(f"The mirror is kept in the database, set its password with {DB_PASSWORD_ENV} or --db-password-file.")
+    if arguments.org:
+        organization_ids = [resolve_organization(api_key, value)['id'] for value in arguments.org]
+    else:
+        organization_ids = meraki_api.mirror.organizations(api_key)
+    if not organization_ids:
+        raise CommandError("No Organization is mirrored yet, pick one with --org")
+    return meraki_mirror.sync_organizations(
+        api_key, organization_ids, arguments.full,
+        progress=lambda result: print(f"{result['organization_id']}: {result.get('mode', 'failed')} sync, {result.get('requests', 0)} requests {result['error']}")
+    )
+
+def read_actions_csv(path, columns, build_action):
+    try:
+        with open(path, newline='', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            missing = [column for column in columns if column not in (reader.fieldnames or [])]
+            if missing:
+                raise CommandError(f"{path} has no {', '.join(missing)} column")
+            actions = [build_action(row) for row in reader]
+    except OSError as e:
+        raise CommandError(f"Cannot read {path}: {e.strerror}")
+    if not actions:
+        raise CommandError(f"{path} has no rows")
+    return actions
+
+def run_actions(api_key, arguments, actions):
+    # The table goes to stderr with the other messages, one row per action to stdout
+    organization = resolve_organization(api_key, arguments.org)
+    results = meraki_action_batches.run_action_batches(api_key, organization['id'], actions, arguments.timeout)
+    meraki_action_batches.display_action_batch_results(results)
+    return [{
+        "resource": result['action']['resource'],
+        "operation": result['action']['operation'],
+        "batch_id": result['batch_id'],
+        "status": result['status'],
+        "errors": "; ".join(str(error) for error in result['errors'])
+    } for result in results]
+
+def command_rename_ports(api_key, arguments):
+    actions = read_actions_csv(arguments.csv, ("serial", "port_id", "name"),
+                               lambda row: meraki_action_batches.rename_switch_port_action(row['serial'], row['port_id'], row['name']))
+    return run_actions(api_key, arguments, actions)
+
+def command_retag(api_key, arguments):
+    actions = read_actions_csv(arguments.csv, ("serial", "tags"),
+                               lambda row: meraki_action_batches.retag_device_action(row['serial'], (row['tags'] or "").split()))
+    return run_actions(api_key, arguments, actions)
+
+def command_exporter(api_key, arguments):
+    organization_ids = [resolve_organization(api_key, value)['id'] for value in arguments.org or []]
+    host, port = arguments.listen
+    meraki_exporter.run_exporter(api_key, organization_ids, host, port, arguments.interval)
+    return None
+
+MERAKI_COMMANDS = {
+    "orgs": command_orgs,
+    "networks": command_networks,
+    "devices": command_devices,
+    "ports": command_ports,
+    "fw-rules": command_fw_rules,
+    "statuses": command_statuses,
+    "export": command_export,
+    "sweep": command_sweep,
+    "mirror-sync": command_mirror_sync,
+    "rename-ports": command_rename_ports,
+    "retag": command_retag,
+    "exporter": command_exporter
+}
+
+def run(arguments, api_key=None, ipinfo_token=None):
+    """
+    Run the subcommand selected in 'arguments' and return the process exit code.
+    Messages the getters print are moved to stderr so stdout carries only data.
+    """
+    stdout = sys.stdout
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            if arguments.command == "dnsbl":
+                result = command_dnsbl(arguments)
+            elif arguments.command == "ipcheck":
+                if not ipinfo_token:
+                    raise CommandError(f"No IPinfo token found. Set {IPINFO_TOKEN_ENV}, or the database password with {DB_PASSWORD_ENV} or --db-password-file.")
+                result = command_ipcheck(ipinfo_token, arguments)
+            else:
+                if not api_key:
+                    raise CommandError(f"No Cisco Meraki API key found. Set {API_KEY_ENV}, or the database password with {DB_PASSWORD_ENV} or --db-password-file.")
+                result = MERAKI_COMMANDS[arguments.command](api_key, arguments)
+    except CommandError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+
+    if result is not None:
+        write_output(result, arguments.format, stdout)
+    return 0
@@ -41,31 +41,27 @@ from termcolor import colored
 # ==================================================
 # IMPORT custom modules
 # ==================================================
-from modules.meraki import meraki_api 
-from modules.meraki import meraki_ms_mr
-from modules.meraki import meraki_mx
-
-from modules.tools.dnsbl import dnsbl_check
-from modules.tools.utilities import tools_ipcheck
-from modules.tools.utilities import tools_passgen
-from modules.tools.utilities import tools_subnetcalc
-
+# Meraki and tool modules are imported by the menus that use them, so they
+# load the first time one of those menus opens instead of at startup
 from settings import term_extra
+from utilities import tracing
 
 
 # ==================================================
 # VISUALIZE submenus for Appliance, Switches and APs
 # ==================================================
 def select_organization(api_key):
+    from modules.meraki import meraki_api
     selected_org = meraki_api.select_organization(api_key)
     return selected_org
 
 def submenu_sw_and_ap(api_key):
+    from modules.meraki import meraki_api
     while True:
         term_extra.clear_screen()
         term_extra.print_ascii_art()
 
-        options = ["Select an Organization", "Return to Main Menu"]
+        options = ["Select an Organization", "Clear Cached Data", "Return to Main Menu"]
 
 
         # Description header over the menu
@@ -77,7 +73,7 @@ def submenu_sw_and_ap(api_key):
         print("│".ljust(59) + "│")
         print("└" + "─" * 58 + "┘")
         
-        choice = input(colored("\nChoose a menu option [1-2]: ", "cyan"))
+        choice = input(colored("\nChoose a menu option [1-3]: ", "cyan"))
 
         if choice == '1':
             selected_org = select_organization(api_key)
@@ -87,14 +83,20 @@ def submenu_sw_and_ap(api_key):
                 print(colored(f"\nYou selected {selected_org['name']}.\n", "green"))
                 select_network(api_key, selected_org['id'])
         elif choice == '2':
+            meraki_api.invalidate_cache()
+            print(colored("\nCached Organizations, Networks and policy objects cleared.", "green"))
+            input(colored("\nPress Enter to return to the precedent menu...", "green"))
+        elif choice == '3':
             break
 
 def submenu_mx(api_key):
+    from modules.meraki import meraki_api
+    from modules.meraki import meraki_mx
     while True:
         term_extra.clear_screen()
         term_extra.print_ascii_art()
 
-        options = ["Select an Organization", "Return to Main Menu"]
+        options = ["Select an Organization", "Clear Cached Data", "Return to Main Menu"]
 
         # Description header over the menu
         print("\n")
@@ -105,7 +107,7 @@ def submenu_mx(api_key):
         print("│".ljust(59) + "│")
         print("└" + "─" * 58 + "┘")
 
-        choice = input(colored("\nChoose a menu option [1-2]: ", "cyan"))
+        choice = input(colored("\nChoose a menu option [1-3]: ", "cyan"))
 
         if choice == '1':
             selected_org = select_organization(api_key)
@@ -115,6 +117,69 @@ def submenu_mx(api_key):
                 print(colored(f"\nYou selected {selected_org['name']}.\n", "green"))
                 meraki_mx.select_mx_network(api_key, selected_org['id'])
         elif choice == '2':
+            meraki_api.invalidate_cache()
+            print(colored("\nCached Organizations, Networks and policy objects cleared.", "green"))
+            input(colored("\nPress Enter to return to the precedent menu...", "green"))
+        elif choice == '3':
+            break
+
+
+# ==================================================
+# VISUALIZE the submenu for Organization wide tasks
+# ==================================================
+def submenu_organization(api_key):
+    from modules.meraki import meraki_api
+    from modules.meraki import meraki_sweep
+    from modules.meraki import meraki_mirror
+    while True:
+        term_extra.clear_screen()
+        term_extra.print_ascii_art()
+
+        options = ["Sweep all Organizations", "Mirror an Organization", "Sync Mirrored Organizations", "Return to Main Menu"]
+
+        # Description header over the menu
+        print("\n")
+        print("┌" + "─" * 58 + "┐")
+        print("│".ljust(59) + "│")
+        for index, option in enumerate(options, start=1):
+            print(f"│ {index}. {option}".ljust(59) + "│")
+        print("│".ljust(59) + "│")
+        print("└" + "─" * 58 + "┘")
+
+        choice = input(colored("\nChoose a menu option [1-4]: ", "cyan"))
+
+        if choice == '1':
+            downloads_path = str(Path.home() / "Downloads")
+            current_time = datetime.now().strftime("%Y-%m-%d_%H-%M")
+            sweep_dir = os.path.join(downloads_path, f"Cisco-Meraki-CLU-Sweep-{current_time}")
+
+            print(colored("\nCollecting networks, devices and statuses of every Organization...\n", "green"))
+            with tracing.span("Sweep all Organizations"):
+                summaries = meraki_sweep.sweep_organizations(
+                    api_key, sweep_dir,
+                    progress=lambda summary: print(f"{summary['organization_name']}: {summary['devices']} devices in {summary['seconds']}s {summary['error']}")
+                )
+                if summaries:
+                    meraki_sweep.display_sweep_summary(summaries, sweep_dir)
+                else:
+                    print(colored("No Organizations to sweep.", "red"))
+            input(colored("\nPress Enter to return to the precedent menu...", "green"))
+        elif choice in ('2', '3'):
+            if meraki_api.mirror is None:
+                print(colored("\nThe mirror is kept in the response cache, which is not available.", "red"))
+            else:
+                if choice == '2':
+                    selected_org = select_organization(api_key)
+                    organization_ids = [selected_org['id']] if selected_org else []
+                else:
+                    organization_ids = meraki_api.mirror.organizations(api_key)
+                if organization_ids:
+                    print(colored("\nSynchronizing, only what changed since the last sync is downloaded...\n", "green"))
+                    meraki_mirror.display_sync_results(meraki_mirror.sync_organizations(api_key, organization_ids))
+                else:
+                    print(colored("\nNo Organization is mirrored yet.", "red"))
+            input(colored("\nPress Enter to return to the precedent menu...", "green"))
+        elif choice == '4':
             break
 
 
@@ -122,6 +187,8 @@ def submenu_mx(api_key):
 # DEFINE how to process data inside Networks
 # ==================================================
 def select_network(api_key, organization_id):
+    from modules.meraki import meraki_api
+    from modules.meraki import meraki_ms_mr
     selected_network = meraki_api.select_network(api_key, organization_id)
     if selected_network:
         network_name = selected_network['name']
@@ -132,6 +199,11 @@ def select_network(api_key, organization_id):
         meraki_dir = os.path.join(downloads_path, f"Cisco-Meraki-CLU-Export-{current_date}")
         os.makedirs(meraki_dir, exist_ok=True)
 
+        # Devices are fetched once per selection and shared by every action below,
+        # they download with their statuses while the menu is being read
+        meraki_api.reset_network_device_index(network_id)
+        meraki_api.prefetch_network(api_key, organization_id, network_id)
+
         while True:
             term_extra.clear_screen()
             term_extra.print_ascii_art()
@@ -140,10 +212,12 @@ def select_network(api_key, organization_id):
                 "Get Switches",
                 "Get Access Points",
                 "Get Switch Ports",
+                "Get All Switch Ports in this Network",
                 "Get Devices Statuses",
                 "Download Switches CSV",
                 "Download Access Points CSV",
-                "Download Devices Statuses CSV (under dev)",
+                "Download Devices Statuses CSV",
+                "Refresh Devices List",
                 "Return to Main Menu"
             ]
             
@@ -156,38 +230,56 @@ def select_network(api_key, organization_id):
             print("│".ljust(59) + "│")
             print("└" + "─" * 58 + "┘")
 
-            choice = input(colored("\nChoose a menu option [1-8]: ", "cyan"))
+            choice = input(colored("\nChoose a menu option [1-10]: ", "cyan"))
 
             if choice == '1':
-                meraki_ms_mr.display_devices(api_key, network_id, 'switches')
+                with tracing.span("Get Switches", network_id=network_id):
+                    meraki_ms_mr.display_devices(api_key, network_id, 'switches')
             elif choice == '2':
-                meraki_ms_mr.display_devices(api_key, network_id, 'access_points')
+                with tracing.span("Get Access Points", network_id=network_id):
+                    meraki_ms_mr.display_devices(api_key, network_id, 'access_points')
             elif choice == '3':
                 serial_number = input("\nEnter the switch serial number: ")
                 if serial_number:
                     print(f"Fetching switch ports for serial: {serial_number}")
-                    meraki_ms_mr.display_switch_ports(api_key, serial_number)
+                    with tracing.span("Get Switch Ports", serial=serial_number):
+                        meraki_ms_mr.display_switch_ports(api_key, serial_number)
                 else:
                     print("[red]Invalid input. Please enter a valid serial number.[/red]")
             elif choice == '4':
-                meraki_ms_mr.display_organization_devices_statuses(api_key, organization_id, network_id)
+                with tracing.span("Get All Switch Ports in this Network", network_id=network_id):
+                    meraki_ms_mr.display_network_switch_ports(api_key, network_id, network_name, meraki_dir)
             elif choice == '5':
-                switches = meraki_api.get_meraki_switches(api_key, network_id)
-                if switches:
-                    meraki_api.export_devices_to_csv(switches, network_name, 'switches', meraki_dir)
-                else:
-                    print("No switches to download.")
+                with tracing.span("Get Devices Statuses", network_id=network_id):
+                    meraki_ms_mr.display_organization_devices_statuses(api_key, organization_id, network_id)
+            elif choice == '6':
+                with tracing.span("Download Switches CSV", network_id=network_id):
+                    switches = meraki_api.get_meraki_switches(api_key, network_id)
+                    if switches:
+                        meraki_api.export_devices_to_csv(switches, network_name, 'switches', meraki_dir)
+                    else:
+                        print("No switches to download.")
                 choice = input(colored("\nPress Enter to return to the precedent menu...", "green"))
 
-            elif choice == '6':
-                access_points = meraki_api.get_meraki_access_points(api_key, network_id)
-                if access_points:
-                    meraki_api.export_devices_to_csv(access_points, network_name, 'access_points', meraki_dir)
-                else:
-                    print("No access points to download.")
+            elif choice == '7':
+                with tracing.span("Download Access Points CSV", network_id=network_id):
+                    access_points = meraki_api.get_meraki_access_points(api_key, network_id)
+                    if access_points:
+                        meraki_api.export_devices_to_csv(access_points, network_name, 'access_points', meraki_dir)
+                    else:
+                        print("No access points to download.")
                 choice = input(colored("\nPress Enter to return to the precedent menu...", "green"))
 
             elif choice == '8':
+                with tracing.span("Download Devices Statuses CSV", network_id=network_id):
+                    meraki_api.export_devices_statuses_to_csv(api_key, organization_id, network_id, network_name, meraki_dir)
+                choice = input(colored("\nPress Enter to return to the precedent menu...", "green"))
+
+            elif choice == '9':
+                with tracing.span("Refresh Devices List", network_id=network_id):
+                    meraki_api.get_network_device_index(api_key, network_id, refresh=True)
+            elif choice == '10':
+                meraki_api.prefetcher.cancel()
                 break
     else:
         print("[red]No network selected or invalid organization ID.[/red]")
@@ -196,7 +288,7 @@ def select_network(api_key, organization_id):
 # ==================================================
 # DEFINE the Swiss Army Knife submenu
 # ==================================================
-def swiss_army_knife_submenu(db_password):
+def swiss_army_knife_submenu(vault):
     while True:
         term_extra.clear_screen()
         term_extra.print_ascii_art()
@@ -225,15 +317,23 @@ def swiss_army_knife_submenu(db_password):
         choice = input(colored("Choose a menu option [1-9]: ", "cyan"))
 
         if choice == '1':
-            dnsbl_check.main()
+            from modules.tools.dnsbl import dnsbl_check
+            with tracing.span("DNSBL Check"):
+                dnsbl_check.main()
         elif choice == '2':
-            tools_ipcheck.main(db_password)
+            from modules.tools.utilities import tools_ipcheck
+            with tracing.span("IP Check"):
+                tools_ipcheck.main(vault)
         elif choice == '3':
             pass
         elif choice == '4':
-            tools_passgen.main()
+            from modules.tools.utilities import tools_passgen
+            with tracing.span("Password Generator"):
+                tools_passgen.main()
         elif choice == '5':
-            tools_subnetcalc.main()
+            from modules.tools.utilities import tools_subnetcalc
+            with tracing.span("Subnet Calculator"):
+                tools_subnetcalc.main()
         elif choice == '6':
             pass
         elif choice == '7':
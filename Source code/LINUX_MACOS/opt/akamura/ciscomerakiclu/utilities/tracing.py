@@ -0,0 +1,167 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import os
+import json
+import time
+import atexit
+import threading
+
+
+# ==================================================
+# WRITE trace spans in the Chrome Trace Event format
+# ==================================================
+# Setting this variable to a file path enables tracing without --trace
+TRACE_ENV = "CISCOMERAKICLU_TRACE"
+
+class Tracer:
+    """
+    Appends events to a JSON array that chrome://tracing, Perfetto and speedscope
+    load directly. Every event is flushed as it is written, and since the closing
+    bracket is optional in this format a session that crashes still yields a
+    readable trace.
+    """
+    def __init__(self):
+        self.file = None
+        self.pid = os.getpid()
+        self._threads = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.file is not None
+
+    def start(self, file_path):
+        with self._lock:
+            self.file = open(file_path, 'w')
+            self.file.write("[\n")
+            self._write({"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": "Cisco Meraki CLU"}}, first=True)
+        atexit.register(self.stop)
+
+    def stop(self):
+        with self._lock:
+            if self.file is not None:
+                self.file.write("\n]\n")
+                self.file.close()
+                self.file = None
+
+    def _write(self, event, first=False):
+        self.file.write(("" if first else ",\n") + json.dumps(event, default=str))
+        self.file.flush()
+
+    def emit(self, event):
+        thread = threading.current_thread()
+        event.update(pid=self.pid, tid=thread.ident)
+        with self._lock:
+            if self.file is None:
+                return
+            if thread.ident not in self._threads:
+                self._threads.add(thread.ident)
+                self._write({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": thread.ident, "args": {"name": thread.name}})
+            self._write(event)
+
+tracer = Tracer()
+
+def now_us():
+    return time.perf_counter_ns() // 1000
+
+
+# ==================================================
+# DEFINE spans and instant events
+# ==================================================
+class Span:
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = now_us()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        tracer.emit({
+            "name": self.name,
+            "cat": self.category,
+            "ph": "X",
+            "ts": self.start,
+            "dur": now_us() - self.start,
+            "args": self.args
+        })
+        return False
+
+    def set(self, **args):
+        self.args.update(args)
+
+class NullSpan:
+    # Returned while tracing is off, so instrumented code pays almost nothing
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **args):
+        pass
+
+NULL_SPAN = NullSpan()
+
+def span(name, category="action", **args):
+    """Time the enclosed block. Spans of the same thread nest by time in the viewer."""
+    if not tracer.enabled:
+        return NULL_SPAN
+    return Span(name, category, args)
+
+def instant(name, category="cache", **args):
+    if tracer.enabled:
+        tracer.emit({"name": name, "cat": category, "ph": "i", "s": "t", "ts": now_us(), "args": args})
+
+def prompt(message):
+    # Time spent waiting for the user is marked apart from the action latency
+    with span("user input", "input"):
+        return input(message)
+
+
+# ==================================================
+# ENABLE tracing from the command line or environment
+# ==================================================
+def enable(file_path=None):
+    file_path = file_path or os.environ.get(TRACE_ENV)
+    if file_path and not tracer.enabled:
+        tracer.start(file_path)
+    return tracer.enabled
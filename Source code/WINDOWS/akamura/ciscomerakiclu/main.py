@@ -34,8 +34,15 @@
 # ==================================================
 import os
 import sys
+import atexit
 import logging
+import argparse
+import contextlib
 import traceback
+import importlib.util
+
+from utilities import import_timer
+import_timer.install_if_requested(sys.argv)
 
 required_packages = {
     "tabulate": "tabulate",
@@ -48,12 +55,8 @@ required_packages = {
     "cryptography": "cryptography"
 }
 
-missing_packages = []
-for module, package in required_packages.items():
-    try:
-        __import__(module)
-    except ImportError:
-        missing_packages.append(package)
+# Only located, not imported: each package loads when the code that needs it runs
+missing_packages = [package for module, package in required_packages.items() if importlib.util.find_spec(module) is None]
 
 if missing_packages:
     print("Missing required Python packages: " + ", ".join(missing_packages))
@@ -69,10 +72,11 @@ from termcolor import colored
 # ==================================================
 # IMPORT custom modules
 # ==================================================
-from api import meraki_api_manager
 from settings import term_extra
 from settings import db_creator
+from settings import db_cache
 from utilities import submenu
+from utilities import tracing
 
 
 # ==================================================
@@ -96,19 +100,28 @@ logger.addHandler(file_handler)
 # ==================================================
 # VISUALIZE the Main Menu
 # ==================================================
-def main_menu(fernet):
+def load_meraki_modules(store):
+    # The Meraki modules, with requests and rich, load when one of their menus is first opened
+    from modules.meraki import meraki_api
+    from modules.meraki import meraki_mirror
+    if store and meraki_api.response_store is None:
+        meraki_api.attach_response_store(store)
+        meraki_api.attach_mirror(meraki_mirror.OrganizationMirror(store))
+
+def main_menu(vault, store=None):
     while True:
         term_extra.clear_screen()
         term_extra.print_ascii_art()
 
-        api_key = meraki_api_manager.get_api_key(fernet)
-        ipinfo_token = db_creator.get_tools_ipinfo_access_token(fernet)
+        # Served from memory, the database was unlocked once after the password prompt
+        api_key = vault.api_key
+        ipinfo_token = vault.ipinfo_token
         options = [
             "Network wide [under dev]",
             "Security & SD-WAN", 
             "Switch and wireless",
             "Environmental [under dev]", 
-            "Organization [under dev]", 
+            "Organization", 
             "The Swiss Army Knife", 
             f"{'Edit Cisco Meraki API Key' if api_key else 'Set Cisco Meraki API Key'}",
             f"{'Edit IPinfo Token' if ipinfo_token else 'Set IPinfo Token'}",
@@ -134,6 +147,7 @@ def main_menu(fernet):
                 pass
             elif choice == '2':
                 if api_key:
+                    load_meraki_modules(store)
                     submenu.submenu_mx(api_key)
                 else:
                     print("Please set the Cisco Meraki API key first.")
@@ -141,6 +155,7 @@ def main_menu(fernet):
 
             elif choice == '3':
                 if api_key:
+                    load_meraki_modules(store)
                     submenu.submenu_sw_and_ap(api_key)
                 else:
                     print("Please set the Cisco Meraki API key first.")
@@ -148,13 +163,18 @@ def main_menu(fernet):
             elif choice == '4':
                 pass
             elif choice == '5':
-                pass
+                if api_key:
+                    load_meraki_modules(store)
+                    submenu.submenu_organization(api_key)
+                else:
+                    print("Please set the Cisco Meraki API key first.")
+                    input(colored("\nPress Enter to return to the main menu...", "green"))
             elif choice == '6':
-                submenu.swiss_army_knife_submenu(fernet)
+                submenu.swiss_army_knife_submenu(vault)
             elif choice == '7':
-                manage_api_key(fernet)
+                manage_api_key(vault)
             elif choice == '8':
-                manage_ipinfo_token(fernet)
+                manage_ipinfo_token(vault)
             elif choice == '9':
                 term_extra.clear_screen()
                 term_extra.print_ascii_art()
@@ -170,14 +190,14 @@ def main_menu(fernet):
         else:
             print(colored("Invalid choice. Please try again.", "red"))
 
-def manage_api_key(fernet):
+def manage_api_key(vault):
     term_extra.clear_screen()
     api_key = input("\nEnter the Cisco Meraki API Key: ")
-    meraki_api_manager.save_api_key(api_key, fernet)
+    vault.save_api_key(api_key)
 
-def manage_ipinfo_token(fernet):
+def manage_ipinfo_token(vault):
     term_extra.clear_screen()
-    current_token = db_creator.get_tools_ipinfo_access_token(fernet)
+    current_token = vault.ipinfo_token
     if current_token:
         print(colored(f"Current IPinfo Token: {current_token}", "yellow"))
         change = input("Do you want to change it? [yes/no]: ").lower()
@@ -186,15 +206,82 @@ def manage_ipinfo_token(fernet):
     
     new_token = input("\nEnter the new IPinfo access token: ")
     if new_token:
-        db_creator.store_tools_ipinfo_access_token(new_token, fernet)
+        vault.save_ipinfo_token(new_token)
         print(colored("\nIPinfo access token saved successfully.", "green"))
     else:
         print(colored("No token entered. No changes made.", "red"))
 
+# ==================================================
+# OPEN the credentials and the mirror of headless runs
+# ==================================================
+def headless_session(arguments):
+    # No prompts here, secrets come from the environment or from the database,
+    # which also holds the Organization mirror
+    from utilities import batch_cli
+    api_key = os.environ.get(batch_cli.API_KEY_ENV)
+    ipinfo_token = os.environ.get(batch_cli.IPINFO_TOKEN_ENV)
+    store = None
+
+    db_password = batch_cli.read_db_password(arguments)
+    vault = db_creator.open_vault(db_password) if db_password and db_creator.database_exists('db/cisco_meraki_clu_db.db') else None
+    if vault:
+        api_key = api_key or vault.api_key
+        ipinfo_token = ipinfo_token or vault.ipinfo_token
+        store = db_cache.open_response_store(vault.fernet)
+    return api_key, ipinfo_token, store
+
+
+# ==================================================
+# PARSE the command line options
+# ==================================================
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Cisco Meraki Command Line Utility. Without a COMMAND the interactive menu starts.", add_help=False)
+    parser.add_argument("--stats", action="store_true", help="print Meraki API statistics per endpoint on exit")
+    parser.add_argument("--stats-json", metavar="FILE", help="write Meraki API statistics per endpoint to FILE on exit")
+    parser.add_argument("--db-password-file", metavar="FILE", help="file holding the database password for COMMAND runs, CISCOMERAKICLU_DB_PASSWORD works too")
+    parser.add_argument("--trace", metavar="FILE", help=f"write trace spans of the session to FILE (Chrome Trace Event format), also enabled by {tracing.TRACE_ENV}")
+    parser.add_argument(import_timer.IMPORT_TIMES_FLAG, action="store_true", help=f"print how long each module took to import on exit, also enabled by {import_timer.IMPORT_TIMES_ENV}")
+
+    # The subcommands and the modules behind them load only when one is given
+    arguments, remaining = parser.parse_known_args()
+    if not remaining:
+        arguments.command = None
+        return arguments
+
+    from utilities import batch_cli
+    parser.add_argument("-h", "--help", action="help", help="show this help message and exit")
+    batch_cli.add_subcommands(parser)
+    return parser.parse_args()
+
+def report_api_stats(arguments):
+    if not (arguments.stats or arguments.stats_json):
+        return
+    from modules.meraki import meraki_api_stats
+    if arguments.stats:
+        # Subcommands keep stdout for their data
+        meraki_api_stats.print_summary(file=sys.stderr if arguments.command else sys.stdout)
+    if arguments.stats_json:
+        meraki_api_stats.dump_json(arguments.stats_json)
+
+
 # ==================================================
 # ERROR handling and logging
 # ==================================================
 if __name__ == "__main__":
+    arguments = parse_arguments()
+    atexit.register(report_api_stats, arguments)
+    tracing.enable(arguments.trace)
+    if arguments.command:
+        from utilities import batch_cli
+        from modules.meraki import meraki_api
+        from modules.meraki import meraki_mirror
+        with contextlib.redirect_stdout(sys.stderr):
+            api_key, ipinfo_token, store = headless_session(arguments)
+        if store:
+            # Commands read mirrored Organizations, every other response is fetched fresh
+            meraki_api.attach_mirror(meraki_mirror.OrganizationMirror(store))
+        import_timer.mark_ready()
+        sys.exit(batch_cli.run(arguments, api_key, ipinfo_token))
     try:
         db_path = 'db/cisco_meraki_clu_db.db'
         if not db_creator.database_exists(db_path):
@@ -202,8 +289,6 @@ if __name__ == "__main__":
             term_extra.print_ascii_art()
             if db_creator.prompt_create_database():
                 db_password = getpass(colored("\nEnter a password for encrypting the database: ", "green"))
-                fernet = db_creator.generate_fernet_key(db_password)
-                db_creator.update_database_schema(db_path, db_password)  # Update the database schema after creation.
             else:
                 print(colored("Database creation cancelled. Exiting program.", "yellow"))
                 exit()
@@ -211,12 +296,15 @@ if __name__ == "__main__":
             os.system('cls')  # Clears the terminal screen.
             term_extra.print_ascii_art()
             db_password = getpass(colored("\n\nWelcome to Cisco Meraki Command Line Utility!\nThis program contains sensitive information. Please insert your password to continue: ", "green"))
-            fernet = db_creator.generate_fernet_key(db_password)
 
-        # At this point, the database exists, so update the schema as needed.
-        db_creator.update_database_schema(db_path, db_password)  # Ensure the schema is updated for existing databases too.
-        
-        main_menu(fernet)
+        # The database is opened once here, the schema is brought up to date on the same connection
+        vault = db_creator.open_vault(db_password)
+        if vault is None:
+            raise ValueError("Incorrect database password.")
+
+        store = db_cache.open_response_store(vault.fernet)
+        import_timer.mark_ready()
+        main_menu(vault, store)
 
     except Exception as e:
         logger.error("An error occurred", exc_info=True)
@@ -0,0 +1,181 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import time
+from rich.console import Console
+from rich.table import Table
+from rich.box import SIMPLE
+
+
+# ==================================================
+# IMPORT custom modules
+# ==================================================
+from modules.meraki import meraki_api
+
+
+# ==================================================
+# BUILD the actions of a bulk configuration change
+# ==================================================
+MAX_ACTIONS_PER_BATCH = 100
+MAX_PENDING_BATCHES = 5
+POLL_INTERVAL = 2
+POLL_INTERVAL_MAX = 30
+# Batches still pending after this many seconds are reported as timed out
+RUN_TIMEOUT = 30 * 60
+
+def build_action(resource, operation, body):
+    return {"resource": resource, "operation": operation, "body": body}
+
+def rename_switch_port_action(serial, port_id, name):
+    return build_action(f"/devices/{serial}/switch/ports/{port_id}", "update", {"name": name})
+
+def retag_device_action(serial, tags):
+    return build_action(f"/devices/{serial}", "update", {"tags": list(tags)})
+
+def chunk_actions(actions, size=MAX_ACTIONS_PER_BATCH):
+    return [actions[i:i + size] for i in range(0, len(actions), size)]
+
+
+# ==================================================
+# SUBMIT and poll Organization action batches
+# ==================================================
+# Returned by submit_action_batch while the Organization already has its maximum of pending batches
+ORGANIZATION_BUSY = object()
+
+def submit_action_batch(api_key, organization_id, actions):
+    body = {"confirmed": True, "synchronous": False, "actions": actions}
+    response = meraki_api.client.post(api_key, "/organizations/{organization_id}/actionBatches", body, organization_id=organization_id)
+    if response.status_code in (200, 201):
+        return meraki_api.decode_json(response)
+    if response.status_code in (400, 429) and "too many concurrently executing batches" in response.text.lower():
+        return ORGANIZATION_BUSY
+    print(f"Failed to submit action batch: {response.status_code}, {response.text}")
+    return None
+
+def get_pending_action_batch_ids(api_key, organization_id):
+    response = meraki_api.client.get(api_key, "/organizations/{organization_id}/actionBatches", {"status": "pending"}, organization_id=organization_id)
+    if response.status_code == 200:
+        return {batch['id'] for batch in meraki_api.decode_json(response)}
+    return None
+
+def get_action_batch(api_key, organization_id, batch_id):
+    response = meraki_api.client.get(api_key, "/organizations/{organization_id}/actionBatches/{batch_id}", organization_id=organization_id, batch_id=batch_id)
+    if response.status_code == 200:
+        return meraki_api.decode_json(response)
+    return None
+
+def run_action_batches(api_key, organization_id, actions, timeout=RUN_TIMEOUT):
+    """
+    Chunk 'actions' into batches of up to 100, keep at most 5 of them running
+    in the Organization and return one result per action. Pending batches are
+    watched with a single list call per poll, backing off while nothing changes.
+    Whatever is still queued or pending after 'timeout' seconds is timed out.
+    """
+    queue = list(enumerate(chunk_actions(actions)))
+    pending = {}
+    results = [None] * len(actions)
+    interval = POLL_INTERVAL
+    deadline = time.monotonic() + timeout
+
+    while queue or pending:
+        busy = False
+        while queue and len(pending) < MAX_PENDING_BATCHES:
+            chunk_index, chunk = queue[0]
+            batch = submit_action_batch(api_key, organization_id, chunk)
+            if batch is ORGANIZATION_BUSY:
+                # Batches submitted by someone else fill the Organization, retry after the next poll
+                busy = True
+                break
+            queue.pop(0)
+            if batch is None:
+                record_results(results, chunk_index, chunk, None, "not submitted", [])
+            else:
+                pending[batch['id']] = (chunk_index, chunk)
+
+        if not pending and not busy:
+            continue
+        if time.monotonic() + interval > deadline:
+            for chunk_index, chunk in queue:
+                record_results(results, chunk_index, chunk, None, "timed out", [])
+            for batch_id, (chunk_index, chunk) in pending.items():
+                record_results(results, chunk_index, chunk, batch_id, "timed out", [])
+            break
+        time.sleep(interval)
+
+        still_pending = get_pending_action_batch_ids(api_key, organization_id) if pending else None
+        if still_pending is None:
+            interval = min(interval * 2, POLL_INTERVAL_MAX)
+            continue
+
+        finished = [batch_id for batch_id in pending if batch_id not in still_pending]
+        for batch_id in finished:
+            chunk_index, chunk = pending.pop(batch_id)
+            batch = get_action_batch(api_key, organization_id, batch_id) or {}
+            status = batch.get('status', {})
+            outcome = "completed" if status.get('completed') else "failed" if status.get('failed') else "unknown"
+            record_results(results, chunk_index, chunk, batch_id, outcome, status.get('errors', []))
+        interval = POLL_INTERVAL if finished else min(interval * 2, POLL_INTERVAL_MAX)
+
+    return results
+
+def record_results(results, chunk_index, chunk, batch_id, outcome, errors):
+    # Action batches are atomic, every action of a batch shares its outcome
+    first = chunk_index * MAX_ACTIONS_PER_BATCH
+    for offset, action in enumerate(chunk):
+        results[first + offset] = {"action": action, "batch_id": batch_id, "status": outcome, "errors": errors}
+
+
+# ==================================================
+# DISPLAY the per-action outcome of the batches
+# ==================================================
+def display_action_batch_results(results):
+    table = Table(show_header=True, header_style="bold green", box=SIMPLE)
+    for column in ["Resource", "Operation", "Batch", "Status", "Errors"]:
+        table.add_column(column.upper(), no_wrap=False)
+
+    for result in results:
+        style = "green" if result['status'] == "completed" else "red"
+        table.add_row(
+            result['action']['resource'],
+            result['action']['operation'],
+            str(result['batch_id'] or "N/A"),
+            f"[{style}]{result['status']}[/{style}]",
+            "; ".join(str(error) for error in result['errors']) or ""
+        )
+
+    console = Console()
+    console.print(table)
+    completed = sum(1 for result in results if result['status'] == "completed")
+    console.print(f"{completed}/{len(results)} actions completed.")
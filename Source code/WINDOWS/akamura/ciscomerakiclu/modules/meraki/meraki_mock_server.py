@@ -0,0 +1,570 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import itertools
+import argparse
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlparse, parse_qs, urlencode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ==================================================
+# GENERATE a synthetic Dashboard of any size
+# ==================================================
+class MockDashboard:
+    """
+    Deterministic fake Organizations built from indexes, so an 8,000-network
+    Organization costs no memory until its objects are requested. Every network
+    has one MX, 'switches' MS switches and 'access_points' MR access points.
+    """
+    def __init__(self, organizations=2, networks=50, switches=4, access_points=6, ports=48, seed=1):
+        self.organizations = organizations
+        self.networks = networks
+        self.switches = switches
+        self.access_points = access_points
+        self.ports = ports
+        self.seed = seed
+        self.action_batches = {}
+        self.configuration_changes = []
+        self.availability_changes = []
+        self._lock = threading.Lock()
+
+    def devices_per_network(self):
+        return 1 + self.switches + self.access_points
+
+    # Organizations and networks
+    def organization(self, org):
+        return {"id": str(100000 + org), "name": f"Mock Organization {org:03d}", "url": "https://localhost/"}
+
+    def org_index(self, organization_id):
+        org = int(organization_id) - 100000
+        if not 0 <= org < self.organizations:
+            raise KeyError(organization_id)
+        return org
+
+    def network(self, org, net):
+        return {
+            "id": f"L_{org}_{net}",
+            "organizationId": str(100000 + org),
+            "name": f"Site {net:05d}",
+            "productTypes": ["appliance", "switch", "wireless"],
+            "timeZone": "Europe/Rome",
+            "tags": [f"region-{net % 5}"]
+        }
+
+    def network_index(self, network_id):
+        match = re.fullmatch(r"L_(\d+)_(\d+)", network_id)
+        if not match or int(match.group(1)) >= self.organizations or int(match.group(2)) >= self.networks:
+            raise KeyError(network_id)
+        return int(match.group(1)), int(match.group(2))
+
+    # Devices
+    def product_type_of(self, dev):
+        if dev == 0:
+            return "MX68", "appliance"
+        if dev <= self.switches:
+            return "MS225-48LP", "switch"
+        return "MR46", "wireless"
+
+    def device(self, org, net, dev):
+        model, product_type = self.product_type_of(dev)
+        return {
+            "name": f"{model.split('-')[0]}-{net:05d}-{dev:02d}",
+            "serial": f"Q2{org:02X}-{net:04X}-{dev:04X}",
+            "mac": f"e0:55:3d:{org % 256:02x}:{net % 256:02x}:{dev % 256:02x}",
+            "model": model,
+            "productType": product_type,
+            "networkId": f"L_{org}_{net}",
+            "lanIp": f"10.{net % 256}.{net // 256 % 256}.{dev + 1}",
+            "firmware": "wired-18-107",
+            "tags": [f"rack-{dev % 3}"],
+            "address": "",
+            "lat": 45.4,
+            "lng": 9.1
+        }
+
+    def device_index(self, serial):
+        match = re.fullmatch(r"Q2([0-9A-F]{2})-([0-9A-F]{4})-([0-9A-F]{4})", serial)
+        if not match:
+            raise KeyError(serial)
+        org, net, dev = (int(group, 16) for group in match.groups())
+        if org >= self.organizations or net >= self.networks or dev >= self.devices_per_network():
+            raise KeyError(serial)
+        return org, net, dev
+
+    def device_status(self, org, net, dev):
+        device = self.device(org, net, dev)
+        rng = random.Random(f"{self.seed}:{org}:{net}:{dev}")
+        status = {
+            "name": device["name"],
+            "serial": device["serial"],
+            "mac": device["mac"],
+            "publicIp": f"203.0.113.{net % 254 + 1}",
+            "networkId": device["networkId"],
+            "status": rng.choice(["online"] * 8 + ["alerting", "offline", "dormant"]),
+            "lastReportedAt": "2024-03-24T10:00:00.000000Z",
+            "lanIp": device["lanIp"],
+            "gateway": f"10.{net % 256}.{net // 256 % 256}.254",
+            "ipType": "dhcp",
+            "primaryDns": "1.1.1.1",
+            "secondaryDns": "8.8.8.8",
+            "productType": device["productType"],
+            "model": device["model"],
+            "tags": device["tags"]
+        }
+        if device["productType"] == "switch":
+            status["components"] = {"powerSupplies": [
+                {"slot": 1, "serial": f"PS1-{device['serial']}", "model": "PWR-MS320-1025WAC", "status": "powering"},
+                {"slot": 2, "serial": f"PS2-{device['serial']}", "model": "PWR-MS320-1025WAC", "status": rng.choice(["powering", "disconnected"])}
+            ]}
+        return status
+
+    def network_indexes(self, org, network_ids=None):
+        if not network_ids:
+            return range(self.networks)
+        return sorted(self.network_index(network_id)[1] for network_id in network_ids if network_id.startswith(f"L_{org}_"))
+
+    def iter_org_device_indexes(self, org, network_ids=None, product_types=None):
+        # Indexes only, pages build the few devices they return
+        for net in self.network_indexes(org, network_ids):
+            for dev in range(self.devices_per_network()):
+                if not product_types or self.product_type_of(dev)[1] in product_types:
+                    yield net, dev
+
+    def uplink_status(self, org, net):
+        appliance = self.device(org, net, 0)
+        rng = random.Random(f"{self.seed}:uplinks:{org}:{net}")
+        return {
+            "networkId": appliance["networkId"],
+            "serial": appliance["serial"],
+            "model": appliance["model"],
+            "lastReportedAt": "2024-03-24T10:00:00Z",
+            "highAvailability": {"enabled": False, "role": "primary"},
+            "uplinks": [
+                {"interface": "wan1", "status": rng.choice(["active"] * 9 + ["failed"]), "ip": f"203.0.113.{net % 254 + 1}", "gateway": "203.0.113.254", "publicIp": f"203.0.113.{net % 254 + 1}", "primaryDns": "1.1.1.1", "secondaryDns": "8.8.8.8", "ipAssignedBy": "static"},
+                {"interface": "wan2", "status": rng.choice(["ready", "not connected"]), "ip": None, "gateway": None, "publicIp": None, "primaryDns": None, "secondaryDns": None, "ipAssignedBy": None}
+            ]
+        }
+
+    # Switch ports
+    def switch_ports(self, serial):
+        return [{
+            "portId": str(port),
+            "name": f"Port {port}",
+            "tags": [],
+            "enabled": True,
+            "poeEnabled": port <= 24,
+            "type": "access" if port <= 44 else "trunk",
+            "vlan": 10 + port % 4,
+            "allowedVlans": "all" if port > 44 else "1-1000",
+            "rstpEnabled": True,
+            "stpGuard": "disabled",
+            "stormControlEnabled": False
+        } for port in range(1, self.ports + 1)]
+
+    def switch_port_statuses(self, serial):
+        rng = random.Random(f"{self.seed}:{serial}")
+        return [{
+            "portId": str(port),
+            "enabled": True,
+            "status": rng.choice(["Connected", "Disconnected"]),
+            "errors": [],
+            "warnings": [],
+            "speed": "1 Gbps",
+            "duplex": "full",
+            "usageInKb": {"total": 0, "sent": rng.randint(0, 10 ** 7), "recv": rng.randint(0, 10 ** 7)},
+            "powerUsageInWh": round(rng.uniform(0, 20), 1)
+        } for port in range(1, self.ports + 1)]
+
+    # MX and policy objects
+    def l3_firewall_rules(self, network_id):
+        return {"rules": [
+            {"comment": "Allow DNS", "policy": "allow", "protocol": "udp", "srcPort": "Any", "srcCidr": "Any", "destPort": "53", "destCidr": "OBJ(1)", "syslogEnabled": False},
+            {"comment": "Block guests", "policy": "deny", "protocol": "any", "srcPort": "Any", "srcCidr": "GRP(2)", "destPort": "Any", "destCidr": "10.0.0.0/8", "syslogEnabled": False},
+            {"comment": "Default rule", "policy": "allow", "protocol": "Any", "srcPort": "Any", "srcCidr": "Any", "destPort": "Any", "destCidr": "Any", "syslogEnabled": False}
+        ]}
+
+    def policy_objects(self, org):
+        return [{"id": "1", "name": "Public DNS", "category": "network", "type": "cidr", "cidr": "1.1.1.1/32", "groupIds": []}]
+
+    def policy_objects_groups(self, org):
+        return [{"id": "2", "name": "Guest Subnets", "category": "NetworkObjectGroup", "objectIds": ["1"]}]
+
+    # Change log and availability history, filled by action batches and by tests
+    def record_configuration_change(self, org, network_id, page, label, new_value=""):
+        with self._lock:
+            self.configuration_changes.append({
+                "ts": iso_timestamp(time.time()),
+                "organizationId": str(100000 + org),
+                "networkId": network_id,
+                "adminName": "Mock Admin",
+                "page": page,
+                "label": label,
+                "oldValue": "",
+                "newValue": new_value
+            })
+
+    def record_availability_change(self, serial, old_status, new_status):
+        org, net, dev = self.device_index(serial)
+        device = self.device(org, net, dev)
+        with self._lock:
+            self.availability_changes.append({
+                "ts": iso_timestamp(time.time()),
+                "organizationId": str(100000 + org),
+                "device": {key: device[key] for key in ("serial", "name", "model", "productType")},
+                "network": {"id": device["networkId"], "name": self.network(org, net)["name"]},
+                "details": {"old": [{"name": "status", "value": old_status}], "new": [{"name": "status", "value": new_status}]}
+            })
+
+    def changes_since(self, changes, org, t0):
+        since = parse_timestamp(t0) if t0 else 0
+        return [change for change in changes if change["organizationId"] == str(100000 + org) and parse_timestamp(change["ts"]) >= since]
+
+    # Action batches complete one second after they are submitted, at most 5 may be pending
+    def create_action_batch(self, org, body):
+        pending = [batch_id for batch_id, batch in self.action_batches.items() if batch["organizationId"] == str(100000 + org) and not self.action_batch(batch_id)["status"]["completed"]]
+        if len(pending) >= 5:
+            return None
+        for action in body.get("actions", []):
+            resource = action.get("resource", "")
+            match = re.match(r"/networks/([\w-]+)/(.+)", resource) or re.match(r"/devices/([\w-]+)/(.+)", resource)
+            if match:
+                network_id = match.group(1) if resource.startswith("/networks/") else self.device(org, *self.device_index(match.group(1))[1:])["networkId"]
+                self.record_configuration_change(org, network_id, match.group(2), action.get("operation", "update"), json.dumps(action.get("body", {})))
+        with self._lock:
+            batch_id = str(len(self.action_batches) + 1)
+            self.action_batches[batch_id] = {
+                "id": batch_id,
+                "organizationId": str(100000 + org),
+                "confirmed": body.get("confirmed", False),
+                "synchronous": body.get("synchronous", False),
+                "actions": body.get("actions", []),
+                "submittedAt": time.time()
+            }
+        return self.action_batch(batch_id)
+
+    def action_batch(self, batch_id):
+        batch = dict(self.action_batches[batch_id])
+        done = time.time() - batch.pop("submittedAt") >= 1
+        batch["status"] = {"completed": done, "failed": False, "errors": [], "createdResources": []}
+        return batch
+
+
+def iso_timestamp(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def parse_timestamp(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+# ==================================================
+# SERVE the Dashboard API endpoints used by the CLU
+# ==================================================
+class MockSettings:
+    latency = 0.0
+    max_page_size = 1000
+    rate_limit = 10
+    error_rate_429 = 0.0
+    retry_after = 1
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    dashboard = MockDashboard()
+    settings = MockSettings()
+    buckets = {}
+    buckets_lock = threading.Lock()
+
+    ROUTES = [
+        (r"/organizations", "organizations"),
+        (r"/organizations/(\d+)/networks", "networks"),
+        (r"/organizations/(\d+)/devices", "org_devices"),
+        (r"/organizations/(\d+)/devices/statuses", "org_devices_statuses"),
+        (r"/organizations/(\d+)/uplinks/statuses", "org_uplinks_statuses"),
+        (r"/organizations/(\d+)/configurationChanges", "configuration_changes"),
+        (r"/organizations/(\d+)/devices/availabilities/changeHistory", "availability_changes"),
+        (r"/organizations/(\d+)/policyObjects", "policy_objects"),
+        (r"/organizations/(\d+)/policyObjects/groups", "policy_objects_groups"),
+        (r"/organizations/(\d+)/actionBatches", "action_batches"),
+        (r"/organizations/(\d+)/actionBatches/(\w+)", "action_batch"),
+        (r"/networks/([\w-]+)/devices", "network_devices"),
+        (r"/networks/([\w-]+)/appliance/firewall/l3FirewallRules", "l3_firewall_rules"),
+        (r"/devices/([\w-]+)/switch/ports", "switch_ports"),
+        (r"/devices/([\w-]+)/switch/ports/statuses", "switch_port_statuses")
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def dispatch(self, method):
+        url = urlparse(self.path)
+        path = url.path[len("/api/v1"):] if url.path.startswith("/api/v1") else url.path
+        query = parse_qs(url.query)
+
+        if not self.headers.get("X-Cisco-Meraki-API-Key"):
+            return self.send_json(401, {"errors": ["Invalid API key"]})
+        if self.settings.latency:
+            time.sleep(self.settings.latency)
+
+        for pattern, name in self.ROUTES:
+            match = re.fullmatch(pattern, path)
+            if match:
+                break
+        else:
+            return self.send_json(404, {"errors": ["Not found"]})
+
+        if self.throttled(match.groups()):
+            self.send_response(429)
+            self.send_header("Retry-After", str(self.settings.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        try:
+            if method == "POST":
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if name != "action_batches":
+                    return self.send_json(405, {"errors": ["Method not allowed"]})
+                batch = self.dashboard.create_action_batch(self.dashboard.org_index(match.group(1)), body)
+                if batch is None:
+                    return self.send_json(400, {"errors": ["Too many concurrently executing batches. Maximum is 5 confirmed but not yet executed batches."]})
+                return self.send_json(201, batch)
+            return getattr(self, f"get_{name}")(query, path, *match.groups())
+        except KeyError:
+            return self.send_json(404, {"errors": ["Not found"]})
+
+    def throttled(self, ids):
+        if self.settings.error_rate_429 and random.random() < self.settings.error_rate_429:
+            return True
+        if not self.settings.rate_limit:
+            return False
+
+        # Same budget as the Dashboard, counted per Organization
+        organization = self.owner_of(ids[0]) if ids else "global"
+        with self.buckets_lock:
+            now = time.monotonic()
+            tokens, last = self.buckets.get(organization, (self.settings.rate_limit, now))
+            tokens = min(self.settings.rate_limit, tokens + (now - last) * self.settings.rate_limit)
+            if tokens < 1:
+                self.buckets[organization] = (tokens, now)
+                return True
+            self.buckets[organization] = (tokens - 1, now)
+        return False
+
+    def owner_of(self, object_id):
+        try:
+            if object_id.isdigit():
+                return self.dashboard.org_index(object_id)
+            if object_id.startswith("L_"):
+                return self.dashboard.network_index(object_id)[0]
+            return self.dashboard.device_index(object_id)[0]
+        except KeyError:
+            return "global"
+
+    def send_json(self, status, payload, link=None):
+        body = json.dumps(payload).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        if link:
+            self.send_header("Link", link)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_page(self, query, path, items, total, build=None):
+        # 'startingAfter' is the offset of the last item already returned,
+        # 'build' turns the items of this page only into API objects
+        per_page = min(int(query.get("perPage", [self.settings.max_page_size])[0]), self.settings.max_page_size)
+        start = int(query.get("startingAfter", ["0"])[0])
+        page = [build(item) if build else item for item in itertools.islice(items, start, start + per_page)]
+
+        link = None
+        if start + per_page < total:
+            next_query = {key: value for key, value in query.items() if key != "startingAfter"}
+            next_query["startingAfter"] = [str(start + per_page)]
+            host = self.headers.get("Host", "localhost")
+            link = f"<http://{host}/api/v1{path}?{urlencode(next_query, doseq=True)}>; rel=next"
+        self.send_json(200, page, link)
+
+    # Organizations and networks
+    def get_organizations(self, query, path):
+        self.send_json(200, [self.dashboard.organization(org) for org in range(self.dashboard.organizations)])
+
+    def get_networks(self, query, path, organization_id):
+        org = self.dashboard.org_index(organization_id)
+        self.send_page(query, path, iter(range(self.dashboard.networks)), self.dashboard.networks, lambda net: self.dashboard.network(org, net))
+
+    def get_network_devices(self, query, path, network_id):
+        org, net = self.dashboard.network_index(network_id)
+        self.send_json(200, [self.dashboard.device(org, net, dev) for dev in range(self.dashboard.devices_per_network())])
+
+    # Organization wide devices and statuses
+    def org_device_page(self, query, path, organization_id, statuses):
+        org = self.dashboard.org_index(organization_id)
+        network_ids = query.get("networkIds[]")
+        product_types = query.get("productTypes[]")
+        total = sum(1 for _ in self.dashboard.iter_org_device_indexes(org, network_ids, product_types))
+        build = self.dashboard.device_status if statuses else self.dashboard.device
+        self.send_page(query, path, self.dashboard.iter_org_device_indexes(org, network_ids, product_types), total, lambda index: build(org, *index))
+
+    def get_org_devices(self, query, path, organization_id):
+        self.org_device_page(query, path, organization_id, statuses=False)
+
+    def get_org_devices_statuses(self, query, path, organization_id):
+        self.org_device_page(query, path, organization_id, statuses=True)
+
+    def get_org_uplinks_statuses(self, query, path, organization_id):
+        org = self.dashboard.org_index(organization_id)
+        nets = self.dashboard.network_indexes(org, query.get("networkIds[]"))
+        self.send_page(query, path, iter(nets), len(nets), lambda net: self.dashboard.uplink_status(org, net))
+
+    # Change log and availability history since 't0'
+    def get_configuration_changes(self, query, path, organization_id):
+        changes = self.dashboard.changes_since(self.dashboard.configuration_changes, self.dashboard.org_index(organization_id), query.get("t0", [None])[0])
+        self.send_page(query, path, iter(changes), len(changes))
+
+    def get_availability_changes(self, query, path, organization_id):
+        changes = self.dashboard.changes_since(self.dashboard.availability_changes, self.dashboard.org_index(organization_id), query.get("t0", [None])[0])
+        self.send_page(query, path, iter(changes), len(changes))
+
+    # Switch ports
+    def get_switch_ports(self, query, path, serial):
+        self.dashboard.device_index(serial)
+        self.send_json(200, self.dashboard.switch_ports(serial))
+
+    def get_switch_port_statuses(self, query, path, serial):
+        self.dashboard.device_index(serial)
+        self.send_json(200, self.dashboard.switch_port_statuses(serial))
+
+    # MX and policy objects
+    def get_l3_firewall_rules(self, query, path, network_id):
+        self.dashboard.network_index(network_id)
+        self.send_json(200, self.dashboard.l3_firewall_rules(network_id))
+
+    def get_policy_objects(self, query, path, organization_id):
+        self.send_json(200, self.dashboard.policy_objects(self.dashboard.org_index(organization_id)))
+
+    def get_policy_objects_groups(self, query, path, organization_id):
+        self.send_json(200, self.dashboard.policy_objects_groups(self.dashboard.org_index(organization_id)))
+
+    # Action batches
+    def get_action_batches(self, query, path, organization_id):
+        batches = [self.dashboard.action_batch(batch_id) for batch_id in list(self.dashboard.action_batches)]
+        if query.get("status") == ["pending"]:
+            batches = [batch for batch in batches if not batch["status"]["completed"]]
+        self.send_json(200, batches)
+
+    def get_action_batch(self, query, path, organization_id, batch_id):
+        self.send_json(200, self.dashboard.action_batch(batch_id))
+
+
+def serve(host="127.0.0.1", port=8080, dashboard=None, settings=None):
+    """
+    Start the mock server in a background thread and return it, call
+    shutdown() on the result to stop it. Useful for benchmarks and scripts.
+    """
+    handler = type("BoundMockRequestHandler", (MockRequestHandler,), {
+        "dashboard": dashboard or MockDashboard(),
+        "settings": settings or MockSettings(),
+        "buckets": {}
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="meraki-mock", daemon=True).start()
+    return server
+
+
+# ==================================================
+# RUN the mock server from the command line
+# ==================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Cisco Meraki Dashboard API v1.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--organizations", type=int, default=2, help="number of synthetic Organizations")
+    parser.add_argument("--networks", type=int, default=50, help="networks per Organization")
+    parser.add_argument("--switches", type=int, default=4, help="MS switches per network")
+    parser.add_argument("--access-points", type=int, default=6, help="MR access points per network")
+    parser.add_argument("--ports", type=int, default=48, help="ports per switch")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--max-page-size", type=int, default=1000, help="largest perPage honored")
+    parser.add_argument("--rate-limit", type=int, default=10, help="calls per second per Organization, 0 disables it")
+    parser.add_argument("--error-rate-429", type=float, default=0.0, help="share of requests randomly answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429")
+    args = parser.parse_args(argv)
+
+    settings = MockSettings()
+    settings.latency = args.latency
+    settings.max_page_size = args.max_page_size
+    settings.rate_limit = args.rate_limit
+    settings.error_rate_429 = args.error_rate_429
+    settings.retry_after = args.retry_after
+    dashboard = MockDashboard(args.organizations, args.networks, args.switches, args.access_points, args.ports)
+
+    server = serve(args.host, args.port, dashboard, settings)
+    print(f"Mock Meraki Dashboard API listening on http://{args.host}:{args.port}/api/v1")
+    print(f"Run the CLU against it with: MERAKI_BASE_URL=http://{args.host}:{args.port}/api/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
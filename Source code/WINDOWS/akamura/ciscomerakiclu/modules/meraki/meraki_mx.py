@@ -49,6 +49,7 @@ from rich.text import Text
 # ================================================== 
 from modules.meraki import meraki_api 
 from settings import term_extra
+from utilities import tracing
 
 
 # ==================================================
@@ -90,10 +91,11 @@ def display_firewall_rules(api_key, network_id, organization_id):
             table.add_row(*styled_row_data)
 
         console = Console()
-        console.print(table)
+        with tracing.span("render table", "render"):
+            console.print(table)
     else:
         print(colored("No firewall rules found in the selected network.", "red"))
-    input(colored("\nPress Enter to return to the previous menu...", "green"))
+    tracing.prompt(colored("\nPress Enter to return to the previous menu...", "green"))
 
 
 
@@ -135,15 +137,17 @@ def select_mx_network(api_key, organization_id):
             choice = input(colored("\nChoose a menu option [1-4]: ", "cyan"))
             
             if choice == '1':
-                display_firewall_rules(api_key, network_id, organization_id)
+                with tracing.span("List Firewall Rules", network_id=network_id):
+                    display_firewall_rules(api_key, network_id, organization_id)
             
             elif choice == '2':
-                firewall_rules = meraki_api.get_l3_firewall_rules(api_key, network_id)
-                
-                if firewall_rules:
-                    meraki_api.export_firewall_rules_to_csv(firewall_rules, network_name, meraki_dir)
-                else:
-                    print("No firewall rules to download.")
+                with tracing.span("Download Firewall Rules CSV", network_id=network_id):
+                    firewall_rules = meraki_api.get_l3_firewall_rules(api_key, network_id)
+
+                    if firewall_rules:
+                        meraki_api.export_firewall_rules_to_csv(firewall_rules, network_name, meraki_dir)
+                    else:
+                        print("No firewall rules to download.")
                 choice = input(colored("\nPress Enter to return to the precedent menu...", "green"))
             elif choice == '3':
                 pass
@@ -0,0 +1,187 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import os
+import re
+import csv
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rich.console import Console
+from rich.table import Table
+from rich.box import SIMPLE
+
+
+# ==================================================
+# IMPORT custom modules
+# ==================================================
+from modules.meraki import meraki_api
+from utilities import tracing
+
+
+# ==================================================
+# COLLECT the inventory of one Organization
+# ==================================================
+# Organizations swept at the same time, each one has its own 10 calls/s bucket
+# and 10 of them stay within the 100 calls/s allowed to a single source IP
+MAX_ORGANIZATION_WORKERS = 10
+
+SUMMARY_COLUMNS = ["organization_id", "organization_name", "networks", "devices", "online", "alerting", "offline", "dormant", "by_product_type", "seconds", "error"]
+
+def sweep_organization(api_key, organization):
+    """
+    Download networks, devices and statuses of one Organization. The three
+    paginated lists are fetched side by side since they share the bucket of the
+    Organization anyway, so the sweep of an Organization is as long as its
+    slowest list.
+    """
+    organization_id = organization['id']
+    started = time.monotonic()
+    result = {"organization": organization, "networks": [], "devices": [], "statuses": [], "error": None}
+
+    with tracing.span("Sweep Organization", "sweep", organization_id=organization_id), ThreadPoolExecutor(max_workers=3) as executor:
+        jobs = {
+            # Downloaded like the other two lists, never from a cache older than them
+            "networks": executor.submit(list, meraki_api.fetch_meraki_networks(api_key, organization_id)),
+            "devices": executor.submit(list, meraki_api.iter_organization_devices(api_key, organization_id)),
+            "statuses": executor.submit(list, meraki_api.iter_organization_devices_statuses(api_key, organization_id))
+        }
+        errors = []
+        for name, job in jobs.items():
+            try:
+                result[name] = job.result()
+            except meraki_api.MerakiAPIError as e:
+                errors.append(f"{name}: status code {e.status_code}")
+            except Exception as e:
+                # Connection errors and malformed responses fail this list only
+                errors.append(f"{name}: {type(e).__name__}: {e}")
+
+    result["error"] = "; ".join(errors) or None
+    result["seconds"] = round(time.monotonic() - started, 2)
+    return result
+
+def summarize(result):
+    statuses = Counter(device.get('status') for device in result["statuses"])
+    product_types = Counter(device.get('productType') for device in result["devices"])
+    return {
+        "organization_id": result["organization"]['id'],
+        "organization_name": result["organization"]['name'],
+        "networks": len(result["networks"]),
+        "devices": len(result["devices"]),
+        "online": statuses.get("online", 0),
+        "alerting": statuses.get("alerting", 0),
+        "offline": statuses.get("offline", 0),
+        "dormant": statuses.get("dormant", 0),
+        "by_product_type": " ".join(f"{product_type}:{count}" for product_type, count in sorted(product_types.items(), key=lambda item: str(item[0]))),
+        "seconds": result["seconds"],
+        "error": result["error"] or ""
+    }
+
+
+# ==================================================
+# WRITE per-Organization outputs and the summary
+# ==================================================
+def safe_file_name(name):
+    return re.sub(r'[^\w.-]+', '_', name).strip('_') or "organization"
+
+def write_organization(result, output_dir):
+    organization = result["organization"]
+    file_path = os.path.join(output_dir, f"{safe_file_name(organization['name'])}_{organization['id']}.json")
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump({key: result[key] for key in ("organization", "networks", "devices", "statuses", "error")}, file, indent=2)
+    return file_path
+
+def write_summary(summaries, output_dir):
+    with open(os.path.join(output_dir, "summary.json"), 'w', encoding='utf-8') as file:
+        json.dump(summaries, file, indent=2)
+    with open(os.path.join(output_dir, "summary.csv"), 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=[col.upper() for col in SUMMARY_COLUMNS])
+        writer.writeheader()
+        for summary in summaries:
+            writer.writerow({col.upper(): summary[col] for col in SUMMARY_COLUMNS})
+
+
+# ==================================================
+# SWEEP every accessible Organization in parallel
+# ==================================================
+def sweep_organizations(api_key, output_dir, organizations=None, workers=MAX_ORGANIZATION_WORKERS, progress=None):
+    """
+    Sweep 'organizations', or every Organization the key can see, writing one
+    JSON file per Organization and summary.json / summary.csv to 'output_dir'.
+    Returns the summaries sorted by Organization name, None if the list of
+    Organizations cannot be fetched. 'progress' is called with each summary.
+    """
+    if organizations is None:
+        organizations = meraki_api.get_meraki_organizations(api_key)
+        if organizations is None:
+            return None
+    os.makedirs(output_dir, exist_ok=True)
+
+    summaries = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(organizations)))) as executor:
+        jobs = {executor.submit(sweep_organization, api_key, organization): organization for organization in organizations}
+        for job in as_completed(jobs):
+            try:
+                result = job.result()
+                write_organization(result, output_dir)
+                summary = summarize(result)
+            except Exception as e:
+                # One broken Organization is reported in the summary, the sweep goes on
+                summary = summarize({"organization": jobs[job], "networks": [], "devices": [], "statuses": [], "seconds": 0, "error": f"{type(e).__name__}: {e}"})
+            summaries.append(summary)
+            if progress:
+                progress(summary)
+
+    summaries.sort(key=lambda summary: summary["organization_name"].lower())
+    write_summary(summaries, output_dir)
+    return summaries
+
+
+# ==================================================
+# DISPLAY the sweep summary in a table
+# ==================================================
+def display_sweep_summary(summaries, output_dir):
+    table = Table(show_header=True, header_style="bold green", box=SIMPLE)
+    for column in SUMMARY_COLUMNS:
+        table.add_column(column.replace("_", " ").upper(), no_wrap=column != "by_product_type")
+    for summary in summaries:
+        style = "red" if summary["error"] else ""
+        table.add_row(*[str(summary[column]) for column in SUMMARY_COLUMNS], style=style)
+
+    console = Console()
+    with tracing.span("render table", "render"):
+        console.print(table)
+    console.print(f"Results written to {output_dir}")
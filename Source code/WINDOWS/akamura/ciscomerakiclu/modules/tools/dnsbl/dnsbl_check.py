@@ -42,53 +42,66 @@ from rich.table import Table
 from rich.progress import Progress
 from rich.box import SIMPLE
 from settings import term_extra
+from utilities import tracing
 
 def reverse_ip(ip_address):
     """Reverse the IP address for DNSBL queries."""
     return '.'.join(ip_address.split('.')[::-1])
 
+def load_services():
+    """Load the DNSBL services shipped next to this module."""
+    dnsbl_json_path = Path(__file__).parent / 'dnsbl_services.json'
+    with open(dnsbl_json_path, "r") as file:
+        return json.load(file)
+
+def lookup_dnsbl(ip_address, service_domain):
+    """Query one DNSBL service, returns 'listed', 'not listed', 'no answer' or 'error: ...'."""
+    query = f"{reverse_ip(ip_address)}.{service_domain}"
+    try:
+        dns.resolver.resolve(query, 'A')
+        return "listed"
+    except dns.resolver.NoAnswer:
+        return "no answer"
+    except dns.resolver.NXDOMAIN:
+        return "not listed"
+    except Exception as e:
+        return f"error: {e}"
+
 def check_dnsbl(ip_address, services, progress):
     """Check if an IP address is listed in the specified DNSBL services."""
-    reversed_ip = reverse_ip(ip_address)
+    labels = {
+        "listed": colored("Listed: YES", "red"),
+        "no answer": colored("Listed: NO [NO ANSWER]", "green"),
+        "not listed": colored("Listed: NO", "green")
+    }
     results = {}
 
     for service_name, service_domain in progress.track(services.items(), description="☕ Time to take a coffee."):
-        query = f"{reversed_ip}.{service_domain}"
-        try:
-            dns.resolver.resolve(query, 'A')
-            results[service_name] = colored("Listed: YES", "red")
-        except dns.resolver.NoAnswer:
-            results[service_name] = colored("Listed: NO [NO ANSWER]", "green")
-        except dns.resolver.NXDOMAIN:
-            results[service_name] = colored("Listed: NO", "green")
-        except Exception as e:
-            results[service_name] = colored(f"Error: {e}", "yellow")
+        result = lookup_dnsbl(ip_address, service_domain)
+        results[service_name] = labels.get(result) or colored(result.replace("error", "Error", 1), "yellow")
     return results
 
 def main():
     term_extra.clear_screen()
     term_extra.print_ascii_art()
-    current_script_path = Path(__file__).parent
-    dnsbl_json_path = current_script_path / 'dnsbl_services.json'
-
-    with open(dnsbl_json_path, "r") as file:
-        services_to_check = json.load(file)
+    services_to_check = load_services()
 
-    ip_to_check = input("Please enter an IP address to check: ")
+    ip_to_check = tracing.prompt("Please enter an IP address to check: ")
 
     console = Console()
     table = Table(show_header=True, header_style="bold green", box=SIMPLE)
     table.add_column("Service", style="dim", width=50)
     table.add_column("Result")
 
-    with Progress() as progress:
+    with tracing.span("DNSBL lookups", "dns", services=len(services_to_check)), Progress() as progress:
         results = check_dnsbl(ip_to_check, services_to_check, progress)
 
     for service, result in results.items():
         table.add_row(service, result)
 
-    console.print(table)
-    input("Press Enter to return to the submenu...")
+    with tracing.span("render table", "render"):
+        console.print(table)
+    tracing.prompt("Press Enter to return to the submenu...")
 
 
 if __name__ == "__main__":
@@ -67,20 +67,8 @@ def database_exists(db_path):
     db_path = 'db/cisco_meraki_clu_db.db'
     return os.path.exists(db_path)
 
-def verify_database_password():
-    db_path = 'db/cisco_meraki_clu_db.db'
-    try:
-        conn = sqlite3.connect(db_path)
-        conn.execute("SELECT count(*) FROM sensitive_data")
-        conn.close()
-        return True
-    except Exception as e:
-        print(colored("\nError: The provided database password is incorrect.\n", "red"))
-        return False
-
-
 # ==================================================
-# CREATE a new Database table for IPinfo token
+# ASK to create the Database
 # ==================================================
 def prompt_create_database():
     db_path = 'db/cisco_meraki_clu_db.db'
@@ -98,47 +86,52 @@ def prompt_create_database():
         print(colored("\nInvalid input. Please try again.\n", "red"))
         return prompt_create_database()
 
-def update_database_schema(db_path, password):
-    db_path = 'db/cisco_meraki_clu_db.db'
-    try:
-        conn = sqlite3.connect(db_path)
-        conn.execute(f"PRAGMA key = '{password}'")
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS tools_ipinfo (
-                id INTEGER PRIMARY KEY, 
-                access_token TEXT
-            );
-        """)
-        conn.commit()
-        conn.close()
-        print(colored("Database schema updated successfully.", "green"))
-    except Exception as e:
-        print(colored(f"Failed to update database schema: {e}", "red"))
+# ==================================================
+# OPEN the Database once per session
+# ==================================================
+class SessionVault:
+    """
+    Single connection opened after the password prompt, with the Fernet key
+    built once. Secrets are read and decrypted once and served from memory,
+    and changes go through the same connection.
+    """
+    def __init__(self, password, db_path='db/cisco_meraki_clu_db.db'):
+        self.fernet = generate_fernet_key(password)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS tools_ipinfo (id INTEGER PRIMARY KEY, access_token TEXT)")
+        self.conn.commit()
 
-def store_tools_ipinfo_access_token(access_token, password):
-    db_path = 'db/cisco_meraki_clu_db.db'
-    try:
-        conn = sqlite3.connect(db_path)
-        conn.execute(f"PRAGMA key = '{password}'")
-        conn.execute("INSERT INTO tools_ipinfo (access_token) VALUES (?)", (access_token,))
-        conn.commit()
-        conn.close()
-        print(colored("Access token stored successfully.", "green"))
-    except Exception as e:
-        print(colored(f"Failed to store access token: {e}", "red"))
+        # Raises here when the password does not decrypt the stored API key
+        row = self.conn.execute("SELECT data FROM sensitive_data WHERE id = 1").fetchone()
+        self.api_key = self.fernet.decrypt(row[0]).decode('utf-8') if row else None
+        row = self.conn.execute("SELECT access_token FROM tools_ipinfo ORDER BY id LIMIT 1").fetchone()
+        self.ipinfo_token = row[0] if row else None
 
-def get_tools_ipinfo_access_token(password):
-    db_path = 'db/cisco_meraki_clu_db.db'
+    def save_api_key(self, api_key):
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO sensitive_data (id, data) VALUES (1, ?)", (self.fernet.encrypt(api_key.encode('utf-8')),))
+            self.conn.commit()
+            self.api_key = api_key
+            print("API key saved successfully.")
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+    def save_ipinfo_token(self, access_token):
+        # The token is read from the first row, so that row is the one replaced
+        try:
+            self.conn.execute("INSERT OR REPLACE INTO tools_ipinfo (id, access_token) VALUES (1, ?)", (access_token,))
+            self.conn.commit()
+            self.ipinfo_token = access_token
+            print(colored("Access token stored successfully.", "green"))
+        except Exception as e:
+            print(colored(f"Failed to store access token: {e}", "red"))
+
+    def close(self):
+        self.conn.close()
+
+def open_vault(password):
     try:
-        conn = sqlite3.connect(db_path)
-        conn.execute(f"PRAGMA key = '{password}'")
-        cursor = conn.cursor()
-        cursor.execute("SELECT access_token FROM tools_ipinfo LIMIT 1")
-        row = cursor.fetchone()
-        conn.close()
-        if row:
-            return row[0]
+        return SessionVault(password)
+    except Exception:
+        print(colored("\nError: The provided database password is incorrect.\n", "red"))
         return None
-    except Exception as e:
-        print(f"Failed to retrieve access token: {e}")
-        return None
\ No newline at end of file
@@ -0,0 +1,121 @@
+#**************************************************************************
+#   App:         Cisco Meraki CLU                                         *
+#   Version:     1.4                                                      *
+#   Author:      Matia Zanella                                            *
+#   Description: Cisco Meraki CLU (Command Line Utility) is an essential  *
+#                tool crafted for Network Administrators managing Meraki  *
+#   Github:      https://github.com/akamura/cisco-meraki-clu/             *
+#                                                                         *
+#   Icon Author:        Cisco Systems, Inc.                               *
+#   Icon Author URL:    https://meraki.cisco.com/                         *
+#                                                                         *
+#   Copyright (C) 2024 Matia Zanella                                      *
+#   https://www.matiazanella.com                                          *
+#                                                                         *
+#   This program is free software; you can redistribute it and/or modify  *
+#   it under the terms of the GNU General Public License as published by  *
+#   the Free Software Foundation; either version 2 of the License, or     *
+#   (at your option) any later version.                                   *
+#                                                                         *
+#   This program is distributed in the hope that it will be useful,       *
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+#   GNU General Public License for more details.                          *
+#                                                                         *
+#   You should have received a copy of the GNU General Public License     *
+#   along with this program; if not, write to the                         *
+#   Free Software Foundation, Inc.,                                       *
+#   59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.             *
+#**************************************************************************
+
+
+
+# ==================================================
+# IMPORT various libraries and modules
+# ==================================================
+import os
+import sys
+import time
+import atexit
+import builtins
+
+
+# ==================================================
+# MEASURE how long each module takes to import
+# ==================================================
+IMPORT_TIMES_FLAG = "--import-times"
+IMPORT_TIMES_ENV = "CISCOMERAKICLU_IMPORT_TIMES"
+# Imports faster or deeper than this are left out of the report
+REPORT_MIN_SECONDS = 0.001
+REPORT_MAX_DEPTH = 2
+
+class ImportTimer:
+    """
+    Wraps builtins.__import__ and records, for every import statement that
+    loads new modules, the time it took including everything it pulled in.
+    Records made before mark_ready() belong to startup, later ones to the
+    menus that loaded their modules on first use.
+    """
+    def __init__(self):
+        self.records = []
+        self.started = time.perf_counter()
+        self.ready_at = None
+        self._depth = 0
+        self._sequence = 0
+        self._original_import = builtins.__import__
+
+    def install(self):
+        builtins.__import__ = self._import
+        atexit.register(self.report)
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        loaded = len(sys.modules)
+        sequence = self._sequence
+        self._sequence += 1
+        started = time.perf_counter()
+        self._depth += 1
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            if len(sys.modules) > loaded:
+                if level:
+                    # Relative import, named after the package it is relative to
+                    package = (globals or {}).get("__package__") or ""
+                    base = package.rsplit(".", level - 1)[0]
+                    name = f"{base}.{name}" if name else base
+                label = name if not fromlist or f"{name}.{fromlist[0]}" not in sys.modules else f"{name}.{fromlist[0]}"
+                self.records.append((sequence, label, self._depth, time.perf_counter() - started, self.ready_at is None))
+
+    def mark_ready(self):
+        if self.ready_at is None:
+            self.ready_at = time.perf_counter()
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        builtins.__import__ = self._original_import
+        for title, at_startup in (("Startup", True), ("Loaded on first use", False)):
+            # In the order the imports started, each one indented under the import that triggered it
+            records = sorted(record for record in self.records if record[4] == at_startup)
+            if not records:
+                continue
+            total = sum(record[3] for record in records if record[2] == 0)
+            print(f"\n{title} imports: {total * 1000:.1f} ms (times include nested imports)", file=file)
+            for _, label, depth, seconds, _ in records:
+                if depth <= REPORT_MAX_DEPTH and seconds >= REPORT_MIN_SECONDS:
+                    print(f"  {seconds * 1000:8.1f} ms  {'  ' * depth}{label}", file=file)
+        if self.ready_at is not None:
+            print(f"\nReady {(self.ready_at - self.started) * 1000:.1f} ms after the first import", file=file)
+
+timer = None
+
+def install_if_requested(argv):
+    # Called before any other import of main.py, the flag is also declared on its parser
+    global timer
+    if IMPORT_TIMES_FLAG in argv[1:] or os.environ.get(IMPORT_TIMES_ENV):
+        timer = ImportTimer()
+        timer.install()
+
+def mark_ready():
+    if timer is not None:
+        timer.mark_ready()